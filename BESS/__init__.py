@@ -0,0 +1,14 @@
+"""
+Battery energy storage models for Barton House.
+
+sizing (pandas) is imported when size_battery is first accessed.
+"""
+
+from .dispatch import annual_series, dispatch
+
+
+def __getattr__(name):
+    if name == 'size_battery':
+        from .sizing import size_battery
+        return size_battery
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
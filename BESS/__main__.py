@@ -0,0 +1,19 @@
+import argparse
+
+
+# Command line entry point: python -m BESS <command>
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog='bess', description='Barton House battery storage models.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('requirements', help='monthly battery storage requirements for the PV array')
+    args = parser.parse_args(argv)
+
+    if args.command == 'requirements':
+        from .new_battery_calcs_summer_adjusted import main as run
+        run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import numpy as np
+
+
+# Battery dispatch over arbitrary-length consumption and generation series, carrying state of charge throughout.
+
+
+def annual_series(
+        monthly_consumption: list[float],
+        daily_generation: list[float],
+        days_in_month: list[int],
+        hourly_consumption_profile: np.ndarray,
+        hourly_generation_profile: np.ndarray,
+        steps_per_hour: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    """
+    Returns consumption, generation (kWh per step) and month number of every step of a year.
+
+    Each day of a month repeats the normalised hourly profiles, split evenly over steps_per_hour sub-hourly steps.
+    """
+
+    days_in_month = np.asarray(days_in_month)
+    daily_consumption = np.asarray(monthly_consumption)/days_in_month
+    day_consumption = np.repeat(daily_consumption, days_in_month)
+    day_generation = np.repeat(np.asarray(daily_generation, dtype=float), days_in_month)
+
+    consumption_profile = np.repeat(hourly_consumption_profile, steps_per_hour)/steps_per_hour
+    generation_profile = np.repeat(hourly_generation_profile, steps_per_hour)/steps_per_hour
+    consumption = (day_consumption[:, None]*consumption_profile).ravel()
+    generation = (day_generation[:, None]*generation_profile).ravel()
+    month = np.repeat(np.repeat(np.arange(1, 13), days_in_month), 24*steps_per_hour)
+
+    return consumption, generation, month
+
+
+def _compose(a1, lo1, hi1, a2, lo2, hi2):
+
+    """Compose two clamped shifts s -> min(hi, max(lo, s + a)), applying the first one first."""
+
+    return a1 + a2, np.clip(lo1 + a2, lo2, hi2), np.clip(hi1 + a2, lo2, hi2)
+
+
+def dispatch(
+        consumption: np.ndarray,
+        generation: np.ndarray,
+        capacity,
+        efficiency,
+        soc_init=0,
+        chunk_size: int = 4096,
+        min_batch: int = 32,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    """
+    Simulate battery charge/discharge step by step. Returns state of charge, unmet demand and curtailed surplus.
+
+    Surplus generation charges the battery at the given efficiency up to capacity, deficits discharge it down to
+    zero and anything it cannot cover is unmet. Each step is a clamped shift of the state of charge, and clamped
+    shifts compose into clamped shifts, so a chunk is solved with a vectorised prefix scan in O(log n) NumPy
+    passes. The state of charge carries over between chunks. capacity, efficiency and soc_init may be arrays
+    whose shape broadcasts against the leading axes of consumption and generation, to simulate many batteries.
+    From min_batch batteries upwards it steps through time vectorised across batteries instead, which is cheaper
+    once the batch is wide.
+    """
+
+    net = np.asarray(generation, dtype=float) - np.asarray(consumption, dtype=float)
+    capacity = np.asarray(capacity, dtype=float)[..., None]
+    efficiency = np.asarray(efficiency, dtype=float)[..., None]
+    shape = np.broadcast_shapes(net.shape, capacity.shape, efficiency.shape)
+    n = shape[-1]
+
+    soc = np.zeros(shape)
+    unmet = np.zeros(shape)
+    curtailed = np.zeros(shape)
+    soc_prev = np.broadcast_to(np.asarray(soc_init, dtype=float), shape[:-1])
+
+    if np.prod(shape[:-1]) >= min_batch:
+        charge = np.broadcast_to(np.where(net > 0, net*efficiency, net), shape)
+        capacity = np.broadcast_to(capacity[..., 0], shape[:-1])
+        for i in range(n):
+            unbounded = soc_prev + charge[..., i]
+            soc_prev = soc[..., i] = np.minimum(capacity, np.maximum(0, unbounded))
+            unmet[..., i] = np.maximum(0, -unbounded)
+            curtailed[..., i] = np.maximum(0, unbounded - capacity)
+        return soc, unmet, curtailed
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        chunk = net[..., start:stop]
+        a = np.broadcast_to(np.where(chunk > 0, chunk*efficiency, chunk), shape[:-1] + (stop-start,)).copy()
+        lo = np.zeros_like(a)
+        hi = np.broadcast_to(capacity, a.shape).copy()
+
+        # Hillis-Steele scan: after it, step i holds the composition of steps start..i
+        offset = 1
+        while offset < stop-start:
+            a[..., offset:], lo[..., offset:], hi[..., offset:] = _compose(
+                a[..., :-offset], lo[..., :-offset], hi[..., :-offset],
+                a[..., offset:], lo[..., offset:], hi[..., offset:],
+            )
+            offset *= 2
+
+        soc[..., start:stop] = np.minimum(hi, np.maximum(lo, soc_prev[..., None] + a))
+        soc_before = np.concatenate([soc_prev[..., None], soc[..., start:stop-1]], axis=-1)
+        unbounded = soc_before + np.where(chunk > 0, chunk*efficiency, chunk)
+        unmet[..., start:stop] = np.maximum(0, -unbounded)
+        curtailed[..., start:stop] = np.maximum(0, unbounded - capacity)
+        soc_prev = soc[..., stop-1]
+
+    return soc, unmet, curtailed
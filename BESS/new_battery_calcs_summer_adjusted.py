@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import math
+from .dispatch import annual_series, dispatch
 
 # Input Variables
 monthly_consumption = [16360, 14138, 13848, 12497, 11046, 9787, 
@@ -20,57 +21,51 @@ hourly_generation_profile = [0, 0, 0, 0, 2, 5, 10, 15, 20, 20, 15, 10, 5, 2, 0,
 hourly_consumption_profile = np.array(hourly_consumption_profile) / sum(hourly_consumption_profile)
 hourly_generation_profile = np.array(hourly_generation_profile) / sum(hourly_generation_profile)
 
-# Initialize storage requirements
-results = []
-
-for i in range(12):  # Iterate over each month
-    daily_consumption = monthly_consumption[i] / days_in_month[i]
-    daily_gen = daily_generation[i]
-    
-    # Hourly consumption and generation
-    hourly_consumption = daily_consumption * hourly_consumption_profile
-    hourly_generation = daily_gen * hourly_generation_profile
-    
-    # Simulate battery operation
-    battery_soc = 0  # State of charge (kWh)
-    required_storage = 0  # Total storage required (kWh)
-    
-    for hour in range(24):
-        net_energy = hourly_generation[hour] - hourly_consumption[hour]
-        if net_energy > 0:  # Surplus, charge the battery
-            battery_soc += net_energy * battery_efficiency
-            if battery_soc > battery_capacity:
-                battery_soc = battery_capacity  # Cap at max capacity
-        else:  # Deficit, discharge the battery
-            battery_soc += net_energy  # Net energy is negative
-            if battery_soc < 0:  # If battery can't meet demand
-                required_storage += abs(battery_soc)  # Track unmet demand
-                battery_soc = 0  # Battery is depleted
-
-    # Adjust for depth of discharge and safety margin
-    adjusted_storage = required_storage / (depth_of_discharge * battery_efficiency)
-    adjusted_storage *= (1 + safety_margin)
-    total_batteries = math.ceil(adjusted_storage / battery_capacity)
-    
-    # Store results
-    results.append({
-        "Month": i + 1,
-        "Daily Consumption (kWh)": round(daily_consumption, 2),
-        "Daily Generation (kWh)": daily_gen,
-        "Required Storage (kWh)": round(adjusted_storage, 2),
-        "Batteries Required": total_batteries
-    })
-
-# Convert results to a DataFrame for better visualization
-df = pd.DataFrame(results)
-
-# Print the results
-print("Monthly Battery Storage Requirements:")
-print(df.to_string(index=False))
-
-# Calculate and print capacity after degradation and total BESS capacity
-actual_battery_capacity = battery_capacity
-total_bess_capacity = actual_battery_capacity * df["Batteries Required"].max()
-
-print(f"Capacity After Degradation (kWh): {actual_battery_capacity:.2f}")
-print(f"Total BESS Capacity (kWh): {total_bess_capacity:.2f}")
+
+def main():
+    # Simulate a full year hour by hour, carrying the state of charge across days and months
+    consumption, generation, month = annual_series(
+        monthly_consumption, daily_generation, days_in_month, hourly_consumption_profile, hourly_generation_profile
+    )
+    battery_soc, unmet, curtailed = dispatch(consumption, generation, battery_capacity, battery_efficiency)
+
+    results = []
+
+    for i in range(12):  # Iterate over each month
+        daily_consumption = monthly_consumption[i] / days_in_month[i]
+        daily_gen = daily_generation[i]
+
+        # Average daily unmet demand in this month
+        required_storage = unmet[month == i + 1].sum() / days_in_month[i]
+
+        # Adjust for depth of discharge and safety margin
+        adjusted_storage = required_storage / (depth_of_discharge * battery_efficiency)
+        adjusted_storage *= (1 + safety_margin)
+        total_batteries = math.ceil(adjusted_storage / battery_capacity)
+
+        # Store results
+        results.append({
+            "Month": i + 1,
+            "Daily Consumption (kWh)": round(daily_consumption, 2),
+            "Daily Generation (kWh)": daily_gen,
+            "Required Storage (kWh)": round(adjusted_storage, 2),
+            "Batteries Required": total_batteries
+        })
+
+    # Convert results to a DataFrame for better visualization
+    df = pd.DataFrame(results)
+
+    # Print the results
+    print("Monthly Battery Storage Requirements:")
+    print(df.to_string(index=False))
+
+    # Calculate and print capacity after degradation and total BESS capacity
+    actual_battery_capacity = battery_capacity
+    total_bess_capacity = actual_battery_capacity * df["Batteries Required"].max()
+
+    print(f"Capacity After Degradation (kWh): {actual_battery_capacity:.2f}")
+    print(f"Total BESS Capacity (kWh): {total_bess_capacity:.2f}")
+
+
+if __name__ == '__main__':
+    main()
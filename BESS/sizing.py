@@ -0,0 +1,64 @@
+import itertools
+import numpy as np
+import pandas as pd
+from .dispatch import dispatch
+
+
+# Searches battery configurations for the cheapest one meeting an unmet-demand target.
+
+
+def size_battery(
+        consumption: np.ndarray,
+        generation: np.ndarray,
+        unit_capacities: list[float],
+        unit_costs: list[float],
+        unit_counts: list[int],
+        depths_of_discharge: list[float],
+        efficiencies: list[float],
+        degradations: list[float],
+        max_unmet_fraction: float,
+        batch_size: int = 512,
+    ) -> tuple[dict, pd.DataFrame]:
+
+    """
+    Evaluate every combination of the given grids and return the cheapest one meeting the target, with the table.
+
+    unit_capacities, unit_costs = nominal capacity (kWh) and cost (£) of each unit option
+    max_unmet_fraction = highest acceptable share of total consumption left unmet by PV and battery
+    batch_size = configurations dispatched together along a NumPy axis
+
+    Usable capacity is count*capacity*(1-degradation)*DoD. The best configuration is None if none meets the target.
+    """
+
+    options = list(zip(unit_capacities, unit_costs))
+    grid = list(itertools.product(options, unit_counts, depths_of_discharge, efficiencies, degradations))
+    option, count, dod, efficiency, degradation = zip(*grid)
+    capacity, cost = (np.array(values) for values in zip(*option))
+    count, dod, efficiency, degradation = (np.array(values) for values in (count, dod, efficiency, degradation))
+    usable = count*capacity*(1-degradation)*dod
+
+    # Unmet demand only depends on usable capacity and efficiency, so each distinct pair is dispatched once
+    pairs, index = np.unique(np.column_stack([usable, efficiency]), axis=0, return_inverse=True)
+    pair_unmet = np.zeros(len(pairs))
+    for start in range(0, len(pairs), batch_size):
+        batch = slice(start, start + batch_size)
+        _, batch_unmet, _ = dispatch(consumption, generation, pairs[batch, 0], pairs[batch, 1])
+        pair_unmet[batch] = batch_unmet.sum(axis=-1)
+    unmet = pair_unmet[index.ravel()]
+
+    table = pd.DataFrame({
+        'Unit capacity (kWh)': capacity,
+        'Units': count,
+        'DoD': dod,
+        'Efficiency': efficiency,
+        'Degradation': degradation,
+        'Usable capacity (kWh)': usable,
+        'Unmet demand (kWh)': unmet,
+        'Unmet fraction': unmet/np.sum(consumption),
+        'Cost (£)': count*cost,
+    })
+
+    feasible = table[table['Unmet fraction'] <= max_unmet_fraction]
+    best = None if feasible.empty else feasible.sort_values(['Cost (£)', 'Unmet demand (kWh)']).iloc[0].to_dict()
+
+    return best, table
@@ -1,11 +1,15 @@
 import math
-import scipy
-import pandas as pd
-from matplotlib import pyplot as plt
-from matplotlib import rcParams
+from typing import TYPE_CHECKING
 import numpy as np
+from .superposition import Superposition, AggregatedSuperposition, step_response
+from .results import SimulationResults, ResultsFile
+from .radial_fd import RadialFD
+from .loads import LoadProfile, AnalyticLoad, seconds_in_year
+from .profiling import Profiler
+from .checkpoint import save_checkpoint, load_checkpoint
 
-seconds_in_year = 3600*24*365.2
+if TYPE_CHECKING:
+    import pandas as pd
 
 class GSHP:
 
@@ -24,6 +28,9 @@ class GSHP:
             grout_density: float,
             grout_heat_capacity: float,
             grout_thermal_conductivity: float,
+            pipe_conduction_resistance: float = None,
+            grout_conduction_resistance: float = None,
+            pipe_convection_resistance: float = None,
         ) -> None:
         self.num_boreholes = num_boreholes
         self.L = depth
@@ -33,14 +40,17 @@ class GSHP:
         self.k_g = grout_thermal_conductivity
         self.alpha_g = GSHP.calc_thermal_diffusivity(self.k_g, grout_density, grout_heat_capacity)
         self.pipe_thickness = self.r/4
-        self.R_p = self.calc_conduction_resistance(self.pipe_thickness, 54)
-        self.R_g = self.calc_conduction_resistance(self.r*2-2*self.pipe_thickness, self.k_g)
-        self.R_con = self.calc_convection_resistance(self.pipe_thickness, 500)
+        self.R_p = self.calc_conduction_resistance(self.pipe_thickness, 54) if pipe_conduction_resistance is None else pipe_conduction_resistance
+        self.R_g = self.calc_conduction_resistance(self.r*2-2*self.pipe_thickness, self.k_g) if grout_conduction_resistance is None else grout_conduction_resistance
+        self.R_con = self.calc_convection_resistance(self.pipe_thickness, 500) if pipe_convection_resistance is None else pipe_convection_resistance
 
-    def plot(self, system_props: pd.DataFrame, y1: list[str], y2: list[str]):
+    def plot(self, system_props: 'pd.DataFrame', y1: list[str], y2: list[str]):
 
         """Plot a given property of the system over time."""
 
+        from matplotlib import pyplot as plt
+        from matplotlib import rcParams
+
         rcParams['font.size'] = 18
 
         fig, ax1 = plt.subplots()
@@ -67,14 +77,11 @@ class GSHP:
 
         """Calc building load at time t where t is seconds since 00:00 on 01/01."""
 
-        years_passed = t//seconds_in_year
-        t -= seconds_in_year*years_passed
-
-        Q_b = 1.8E-10*(2.6E6*6-t)**2+53056
+        Q_b = AnalyticLoad().block(t)
 
         return Q_b
 
-    def model_single_bh(self, t_n: float, time_step: float, T_ground: float, is_heating: bool):
+    def model_single_bh(self, t_n: float, time_step: float, T_ground: float, is_heating: bool, fast: bool = False, cells_per_level: int = 5, as_frame: bool = None, verbose: bool = False, coupled: bool = False, tol: float = 1E-8, max_iter: int = 50, building_load: LoadProfile = None, block_size: int = 1024, profiler: Profiler = None, checkpoint: str = None, checkpoint_every: int = None, resume: str = None, output: str = None, every: int = 1):
 
         '''
         1. Building's temporal distribution of heating/cooling load
@@ -86,29 +93,139 @@ class GSHP:
         5. Calculate heat pump COP
         5.1 Get COP from temp vs COP curve
         6. RETURN TO STEP 2
+
+        fast = use multi-level load aggregation instead of the exact superposition sum. Only faster beyond roughly
+        20000 steps, see AggregatedSuperposition
+        cells_per_level = blocks per aggregation level, more blocks give a smaller error against the exact sum: about
+        8E-3 K at the default 5, 2E-3 K at 10 and 6E-4 K at 20 for the Barton House array
+        as_frame = return a DataFrame, otherwise the SimulationResults array store (or the ResultsFile with output).
+        Defaults to a DataFrame unless output is set, as building one copies the whole results file into memory
+        verbose = print the results
+        coupled = solve for the COP consistent with each step's own outlet temperature (see solve_cop) instead of
+        lagging it one step, so coarse time steps stay accurate. Iterations per step are kept in self.cop_iterations
+        building_load = load source (see loads.py), the analytic fit by default
+        block_size = time steps of building load evaluated at once
+        profiler = Profiler timing each phase of the time loop (see profiling.py)
+        checkpoint = path to save the state to at the end of the run, and every checkpoint_every steps if set
+        resume = path of a checkpoint to continue from, running only the steps after it up to t_n. The results
+        then start at the checkpointed step and match those of an uninterrupted run. The checkpoint must come from
+        the same borehole array with the same time_step, T_ground, is_heating, fast, cells_per_level and coupled
+        output = path of a .npy file to write the results to as they are computed (see ResultsFile), keeping every
+        `every`-th step, instead of holding them in memory
         '''
 
         # Define initial conditions
-        Q_history = [0]
-        cop = GSHP.graph_cop(T_w = self.get_outlet_water_temperature(T_ground, 0))
-
         n = math.floor(t_n/time_step)
-        system_props = pd.DataFrame(columns=['Time (s)', 'Building load per BH (W)', 'Interface temp (K)', 'Borehole outlet/heat pump inlet temp (K)', 'COP', 'Ground load per BH (W)', 'Elec per BH (W)'])
+        building_load = building_load or AnalyticLoad()
+        if as_frame is None:
+            as_frame = not output
+        if fast:
+            history = AggregatedSuperposition(self.r, self.k_g, self.alpha_g, self.L, time_step, n+1, cells_per_level)
+        else:
+            history = Superposition(self.r, self.k_g, self.alpha_g, self.L, time_step, n+1)
+        cop = GSHP.graph_cop(T_w = self.get_outlet_water_temperature(T_ground, 0))
+        config = self._checkpoint_config(time_step, T_ground, is_heating, fast, cells_per_level, coupled)
+        start = 0
+        if resume:
+            state = load_checkpoint(resume)
+            if not np.array_equal(state['config'], config):
+                raise ValueError(f'{resume} was written for a different borehole array or simulation settings')
+            start, cop = int(state['step']), state['cop'][()]
+            if start > n+1:
+                raise ValueError(f'{resume} is at step {start}, past the last step ({n}) up to t_n = {t_n} s')
+            history.restore(state['history'])
+
+        if output:
+            system_props = ResultsFile(output, n+1-start, every=every, time_step=time_step)
+        else:
+            system_props = SimulationResults(n+1-start)
+        self.cop_iterations = np.zeros(n+1, dtype=int)
+        if profiler:
+            profiler.lap('setup')
 
-        for i in range(n+1):
+        for i in range(start, n+1):
             t = i*time_step
-            Q_b = GSHP.get_building_load(t)/self.num_boreholes
+            if (i-start) % block_size == 0:
+                loads = building_load.block(np.arange(i, min(i+block_size, n+1))*time_step)
+            Q_b = loads[(i-start) % block_size]/self.num_boreholes
+            if profiler:
+                profiler.lap('load')
+            T_interface = T_ground + history.delta_T()
+            if profiler:
+                profiler.lap('superposition')
+            if coupled:
+                cop, self.cop_iterations[i] = self.solve_cop(Q_b, T_interface, is_heating, cop, tol, max_iter)
+                if profiler:
+                    profiler.lap('cop')
             Q_g = self.get_instantaneous_ground_load(Q_b, cop, is_heating)
-            Q_history.append(Q_g)
             Q_hp = GSHP.get_elec_consumption(cop, Q_b)
-            T_interface = T_ground + self.get_change_in_temperature(self.r, time_step, i, Q_history, self.k_g, self.alpha_g)
             T_w = self.get_outlet_water_temperature(T_interface, Q_g)
-            system_props.loc[len(system_props)] = [t, Q_b, T_interface, T_w, cop, Q_g, Q_hp]
+            if profiler:
+                profiler.lap('heat pump')
+            history.append(Q_g)
+            if profiler:
+                profiler.lap('superposition')
+            system_props.append(t, Q_b, T_interface, T_w, cop, Q_g, Q_hp)
+            if profiler:
+                profiler.lap('results')
             cop = GSHP.graph_cop(T_w)
-            
-        print(system_props)
+            if profiler:
+                profiler.lap('cop')
+            if checkpoint and checkpoint_every and (i+1-start) % checkpoint_every == 0:
+                save_checkpoint(checkpoint, {'config': config, 'step': i+1, 'cop': cop, 'history': history.state()})
+
+        if checkpoint:
+            save_checkpoint(checkpoint, {'config': config, 'step': n+1, 'cop': cop, 'history': history.state()})
+        if output:
+            system_props.flush()
+        if profiler:
+            profiler.count('steps', n+1-start)
+            profiler.count('cop iterations', int(self.cop_iterations.sum()))
+        if as_frame:
+            system_props = system_props.to_dataframe()
+            if profiler:
+                profiler.lap('dataframe')
+        if verbose:
+            print(system_props)
+            if coupled:
+                print(f'COP iterations: {self.cop_iterations.sum()} total, {self.cop_iterations.max()} max per step')
         return system_props
 
+    def _checkpoint_config(self, time_step: float, T_ground: float, is_heating: bool, fast: bool, cells_per_level: int, coupled: bool) -> np.ndarray:
+
+        """Everything a checkpoint's state depends on, to check it is resumed under the same settings."""
+
+        return np.array([
+            self.num_boreholes, self.L, self.r, self.k_g, self.alpha_g, self.R_p, self.R_g, self.R_con,
+            time_step, T_ground, is_heating, fast, cells_per_level, coupled,
+        ], dtype=float)
+
+    def solve_cop(self, Q_b, T_interface, is_heating: bool, cop, tol: float = 1E-8, max_iter: int = 50):
+
+        """
+        Returns the COP consistent with the outlet temperature it produces in the same step, and the iterations used.
+
+        Solves cop = graph_cop(T_w) where T_w depends on the ground load drawn at that cop, by secant iteration
+        from the given cop (e.g. last step's). Works elementwise on arrays.
+        """
+
+        def residual(cop):
+            Q_g = self.get_instantaneous_ground_load(Q_b, cop, is_heating)
+            return GSHP.graph_cop(self.get_outlet_water_temperature(T_interface, Q_g)) - cop
+
+        cop_prev, f_prev = cop, residual(cop)
+        cop = cop_prev + f_prev
+        for iterations in range(1, max_iter+1):
+            f = residual(cop)
+            denominator = f - f_prev
+            step = np.where(denominator == 0, 0, f*(cop - cop_prev)/np.where(denominator == 0, 1, denominator))
+            cop_prev, f_prev = cop, f
+            cop = cop - step
+            if np.max(np.abs(step)) < tol:
+                break
+
+        return cop, iterations
+
     def get_instantaneous_ground_load(self, Q_b: float, cop: float, is_heating: bool):
 
         """
@@ -129,10 +246,13 @@ class GSHP:
         Returns change in ground temperature at given position and time.
         """
 
-        delta_T = 0
-        for j in range(1, n+1):
-            delta_T += ((Q[j]-Q[j-1])/(4*math.pi*k*self.L))*scipy.special.expi((r**2)/(4*alpha*(time_step*n-time_step*(j-1))))
-       
+        if n == 0:
+            return 0
+        dQ = np.diff(np.asarray(Q[:n+1], dtype=float))
+        kernel = step_response(r, alpha, time_step, n)
+        with np.errstate(invalid='ignore'):
+            delta_T = (kernel[..., ::-1] @ dQ)/(4*math.pi*k*self.L)
+
         return delta_T
     
     def get_outlet_water_temperature(self, T_interface: float, Q_g: float):
@@ -154,7 +274,7 @@ class GSHP:
         m = 1.3/15
         c = 3.75
 
-        T_w -= 273
+        T_w = T_w - 273
 
         return m*T_w + c
 
@@ -186,79 +306,137 @@ class GSHP:
 
         return R
 
-    def optimise_borehole_config(self, max_heat_per_metre: float, T_ground: float, time_step: float, is_heating: bool, fd: bool, epsilon: float = 1E-5):
+    def optimise_borehole_config(self, max_heat_per_metre: float, T_ground: float, time_step: float, is_heating: bool, fd: bool | str, epsilon: float = 1E-5, far_field: float = 1000, num_nodes: int = 200, num_radii: int = 100, verbose: bool = True, coupled: bool = False, tol: float = 1E-8, max_iter: int = 50, profiler: Profiler = None, profiles: str = None, every: int = 1, building_load: LoadProfile = None):
 
-        """Returns optimal borehole spacing. Assumes the ground gains zero solar energy over the time period, t_n."""
+        """
+        Returns optimal borehole spacing. Assumes the ground gains zero solar energy over the time period, t_n.
+
+        fd = False for the analytic line source, True for explicit FD, 'cn' for Crank-Nicolson or 'implicit' for
+        backward Euler on a stretched mesh out to far_field metres with num_nodes nodes. Prefer 'implicit' for
+        weekly steps, see RadialFD
+        num_radii = radii, 0.1 m apart, at which the ground temperature is reported. The final profile is kept in
+        self.ground_temps. Only the latest profile is held in memory
+        profiles = path of a .npy file to write the radial profile of every `every`-th step to, memory-mapped, with
+        the initial profile as the first row
+        verbose = print the number of boreholes and critical radius
+        coupled, tol, max_iter, profiler, building_load = as in model_single_bh
+        """
 
-        Q_max = -GSHP.get_building_load(t=0)
+        if fd not in (False, True, 'cn', 'implicit'):
+            raise ValueError(f"fd must be False, True, 'cn' or 'implicit', not {fd!r}")
+        building_load = building_load or AnalyticLoad()
+        Q_max = -building_load(0)
         cop = 3.5
         Q_g_max = self.get_instantaneous_ground_load(Q_max, cop, is_heating)
         Q_allowable_per_bh = -max_heat_per_metre*self.L
         safety_factor = 1.5
         num_boreholes = math.ceil((Q_g_max/Q_allowable_per_bh)*safety_factor)
-        print('Num boreholes:', num_boreholes)
+        if verbose:
+            print('Num boreholes:', num_boreholes)
 
         t_n = seconds_in_year
         n = int(t_n//time_step)
 
         mesh_size = 0.1
 
-        if fd:
+        if fd is True:
             Fo = self.alpha_s*(time_step/mesh_size**2)  # Fourier number
             if Fo > 0.5:
                 print(f'WARNING: Fourier number of {Fo} will make this solution unstable.')
 
         t_init = 0
-        radii = [i*mesh_size for i in range(100)]
-        T_init = [288]*len(radii)
-        temporal_temp_dist = [T_init]
-        Q_history = [0]
+        radii = np.arange(num_radii)*mesh_size
+        T_init = np.full(len(radii), 288.0)
+        if profiles:
+            profile_file = np.lib.format.open_memmap(profiles, mode='w+', shape=(math.ceil((n+2)/every), num_radii))
+            profile_file[0] = T_init
+        history = Superposition(self.r, self.k_g, self.alpha_g, self.L, time_step, n+1)
+        if fd in ('cn', 'implicit'):
+            theta = 0.5 if fd == 'cn' else 1
+            ground = RadialFD(self.r, far_field, self.k_s, self.alpha_s, self.L, time_step, T_ground, num_nodes, theta)
+        elif not fd:
+            ground = Superposition(radii, self.k_s, self.alpha_s, self.L, time_step, n+1)  # Kernel matrix of radii x lags
         cop = GSHP.graph_cop(self.get_outlet_water_temperature(T_ground, 0))
+        self.cop_iterations = np.zeros(n+1, dtype=int)
+        loads = building_load.block(t_init + np.arange(n+1)*time_step)/num_boreholes  # Negative indicates heat leaving ground
+        if profiler:
+            profiler.lap('setup')
         for i in range(n+1):
-            t = i*time_step
-            Q_b = GSHP.get_building_load(t_init+t)/num_boreholes  # Negative indicates heat leaving ground
+            Q_b = loads[i]
+            if profiler:
+                profiler.lap('load')
+            T_interface = T_ground + history.delta_T()
+            if profiler:
+                profiler.lap('superposition')
+            if coupled:
+                cop, self.cop_iterations[i] = self.solve_cop(Q_b, T_interface, is_heating, cop, tol, max_iter)
+                if profiler:
+                    profiler.lap('cop')
             Q_g = self.get_instantaneous_ground_load(Q_b, cop, is_heating)   # Heat extracted from ground
             if abs(Q_g) > abs(Q_allowable_per_bh):
                 print('WARNING: Ground load has exceeded theoretical maximum.')
-            Q_history.append(Q_g)
-            T_interface = self.get_change_in_temperature(self.r, time_step, i, Q_history, self.k_g, self.alpha_g)
             T_w = self.get_outlet_water_temperature(T_interface, Q_g)
+            if profiler:
+                profiler.lap('heat pump')
+            history.append(Q_g)
+            if profiler:
+                profiler.lap('superposition')
             cop = GSHP.graph_cop(T_w)
+            if profiler:
+                profiler.lap('cop')
 
             # Calculate ground temp at varying radii
-            T_new = np.zeros(len(T_init))
-            if fd:
+            if fd in ('cn', 'implicit'):
+                T_new = np.interp(radii, ground.radii, ground.step(Q_g))
+            elif fd:
+                T_new = np.empty(len(T_init))
                 q_g = Q_g/(2*math.pi*self.r*self.L)  # Heat flux per unit surface area
                 T_new[0] = 0.25*(2*T_init[0] + T_init[1] + 2*q_g*mesh_size/self.k_s)  # Known heat flux BC
                 T_new[-1] = T_ground
-                for j in range(1, len(T_init)-1):
-                    T_new[j] = Fo*(T_init[j+1]+T_init[j-1]) + (1-2*Fo)*T_init[j]
+                T_new[1:-1] = Fo*(T_init[2:]+T_init[:-2]) + (1-2*Fo)*T_init[1:-1]
             else:
-                for j, r in enumerate(radii):
-                    T_new[j] = T_ground + self.get_change_in_temperature(r, time_step, i, Q_history, self.k_s, self.alpha_s)
+                T_new = T_ground + ground.delta_T()
+                ground.append(Q_g)
+
+            if profiler:
+                profiler.lap('ground')
 
-            temporal_temp_dist.append(T_new)
+            if profiles and (i+1) % every == 0:
+                profile_file[(i+1)//every] = T_new
             T_init = T_new
+            if profiler:
+                profiler.lap('results')
 
         # # Plot the final ground temp at varying radii
-        # plt.scatter(radii, temporal_temp_dist[-1])
-        # # for p in range(len(temporal_temp_dist)):
-        # #     plt.plot(radii, temporal_temp_dist[p])
+        # plt.scatter(radii, T_init)
+        # # for p in range(len(profile_file)):
+        # #     plt.plot(radii, profile_file[p])
         # plt.axhline(T_ground, color='r', linestyle='--')
         # plt.xlabel('Radial distance from BH [m]')
         # plt.ylabel('Ground temp [K]')
         # plt.title(f't={t_n}s')
         # plt.show()
 
+        self.ground_temps = T_init
+        if profiles:
+            profile_file.flush()
+
         # Find critical radius by radius at which diff between ground temp and undisturbed ground temp is less than epsilon
         min_loss = 1E2
         r_crit = None
-        for index, temp in enumerate(temporal_temp_dist[-1]):
+        for index, temp in enumerate(T_init):
             loss = abs(temp - T_ground)
             if loss < min_loss:
                 min_loss = loss
                 r_crit = radii[index]
 
-        print('Critical radius: ', r_crit)
+        if profiler:
+            profiler.lap('r_crit')
+            profiler.count('steps', n+1)
+            profiler.count('cop iterations', int(self.cop_iterations.sum()))
+        if verbose:
+            print('Critical radius: ', r_crit)
+            if coupled:
+                print(f'COP iterations: {self.cop_iterations.sum()} total, {self.cop_iterations.max()} max per step')
 
         return r_crit, num_boreholes
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+Thermodynamic modelling of the Barton House ground-loop array.
+
+Only NumPy is imported up front. SciPy, pandas and matplotlib load on first use, and the pandas-backed sweep and
+Monte Carlo tools are imported when first accessed.
+"""
+
+from .GSHP import GSHP
+from .batch import GSHPBatch
+from .borefield import Borefield, rectangular_grid
+from .loads import LoadProfile, AnalyticLoad, MonthlyLoad, SeriesLoad, MeterLoad, ScaledProfile, seconds_in_year
+from .results import SimulationResults
+from .superposition import Superposition, AggregatedSuperposition, kernel_cache
+
+_lazy = {
+    'run_sweep': '.sweep',
+    'run_monte_carlo': '.monte_carlo',
+    'cosimulate': '.cosim',
+    'Surrogate': '.surrogate',
+}
+
+
+def __getattr__(name):
+    if name in _lazy:
+        import importlib
+        return getattr(importlib.import_module(_lazy[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,63 @@
+import argparse
+
+
+# Command line entry point: python -m Thermodynamics <command>
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog='gshp', description='Barton House ground source heat pump models.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('simulate', help='simulate a year of the borehole array and print the running costs')
+    commands.add_parser('optimise', help='size borehole arrays over depth and soil conductivity')
+    commands.add_parser('energy-usage', help='plot the ONS-derived monthly energy demand and its fit')
+    monte_carlo = commands.add_parser('monte-carlo', help='sample building load uncertainty')
+    monte_carlo.add_argument('--scenarios', type=int, default=10000)
+    cosimulate = commands.add_parser('cosimulate', help='run the heat pump, PV and battery together over several years')
+    cosimulate.add_argument('--years', type=int, default=10)
+    benchmark = commands.add_parser('benchmark', help='time the hot paths and check them against the golden results')
+    benchmark.add_argument('-k', '--pattern', default='', help='only run cases whose name contains this')
+    benchmark.add_argument('--update-golden', action='store_true', help='store the outputs as the new golden results')
+    benchmark.add_argument('--baseline-golden', action='store_true', help='first store golden results computed with the original code (slow)')
+    benchmark.add_argument('--repeats', type=int, default=1)
+    benchmark.add_argument('--csv', help='write the results table to this file')
+    benchmark.add_argument('--aggregation', action='store_true', help='also compare exact and aggregated superposition over 50 years')
+    surrogate = commands.add_parser('surrogate', help='build or query the interpolation table of borehole designs')
+    surrogate.add_argument('path', help='.npz file of the table')
+    surrogate.add_argument('--build', action='store_true', help='run the model over the default grid and save the table to path')
+    surrogate.add_argument('--workers', type=int, help='processes used to build the table')
+    for axis in ['depth', 'k-s', 'alpha-s', 'radius', 'load-scale']:
+        surrogate.add_argument(f'--{axis}', type=float)
+    args = parser.parse_args(argv)
+
+    if args.command == 'simulate':
+        from .main import main as run
+        run()
+    elif args.command == 'optimise':
+        from .array_optim import main as run
+        run()
+    elif args.command == 'energy-usage':
+        from .BartonHouseEnergyUsageFINAL import main as run
+        run()
+    elif args.command == 'monte-carlo':
+        from .monte_carlo import main as run
+        run(args.scenarios)
+    elif args.command == 'cosimulate':
+        from .cosim import main as run
+        run(args.years)
+    elif args.command == 'benchmark':
+        from .benchmark import bench_import, bench_aggregation, run_suite, store_baseline_golden
+        if args.baseline_golden:
+            store_baseline_golden()
+        bench_import()
+        table = run_suite(args.pattern, args.update_golden, repeats=args.repeats, csv_path=args.csv)
+        if args.aggregation:
+            bench_aggregation()
+        if (table['Status'] == 'FAIL').any():
+            raise SystemExit(1)
+    elif args.command == 'surrogate':
+        from .surrogate import main as run
+        run(args.path, args.build, args.workers, depth=args.depth, k_s=args.k_s, alpha_s=args.alpha_s, radius=args.radius, load_scale=args.load_scale)
+
+
+if __name__ == '__main__':
+    main()
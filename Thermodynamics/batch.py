@@ -0,0 +1,71 @@
+import math
+import numpy as np
+from .GSHP import GSHP
+from .loads import LoadProfile, AnalyticLoad
+from .superposition import Superposition, AggregatedSuperposition
+from .results import SimulationResults
+
+
+class GSHPBatch(GSHP):
+
+    """
+    Model N borehole configurations at once.
+
+    Holds the per-configuration constants of each GSHP as arrays under the same attribute names, so the inherited
+    GSHP formulas apply elementwise and every time step advances all configurations together. Configurations with
+    the same radius and grout diffusivity share one step response, so their superposition is a single product.
+    """
+
+    def __init__(self, bh_arrays: list[GSHP]) -> None:
+        self.bh_arrays = bh_arrays
+        for name in ['num_boreholes', 'L', 'r', 'k_s', 'alpha_s', 'k_g', 'alpha_g', 'R_p', 'R_g', 'R_con']:
+            setattr(self, name, np.array([getattr(bh_array, name) for bh_array in bh_arrays], dtype=float))
+
+        kernels, index = np.unique(np.stack([self.r, self.alpha_g], axis=1), axis=0, return_inverse=True)
+        self.groups = [np.flatnonzero(index.ravel() == u) for u in range(len(kernels))]
+
+    def __len__(self) -> int:
+        return len(self.bh_arrays)
+
+    def model_single_bh(self, t_n: float, time_step: float, T_ground: float, is_heating: bool, fast: bool = False, cells_per_level: int = 5, coupled: bool = False, tol: float = 1E-8, max_iter: int = 50, building_load: LoadProfile = None, block_size: int = 1024) -> SimulationResults:
+
+        """
+        Batched GSHP.model_single_bh. Each column of the results has shape (n, len(self)).
+
+        building_load = load source (see loads.py), either shared or one load per configuration
+        block_size = time steps of building load evaluated at once
+        """
+
+        n = math.floor(t_n/time_step)
+        building_load = building_load or AnalyticLoad()
+        histories = []
+        for group in self.groups:
+            args = (self.r[group[0]], self.k_g[group], self.alpha_g[group[0]], self.L[group], time_step, n+1)
+            if fast:
+                histories.append(AggregatedSuperposition(*args, cells_per_level, size=len(group)))
+            else:
+                histories.append(Superposition(*args, size=len(group)))
+        cop = GSHP.graph_cop(self.get_outlet_water_temperature(T_ground, np.zeros(len(self))))
+
+        system_props = SimulationResults(n+1, len(self))
+        T_interface = np.zeros(len(self))
+        self.cop_iterations = np.zeros(n+1, dtype=int)
+
+        for i in range(n+1):
+            t = i*time_step
+            if i % block_size == 0:
+                loads = building_load.block(np.arange(i, min(i+block_size, n+1))*time_step)
+            Q_b = loads[i % block_size]/self.num_boreholes
+            for group, history in zip(self.groups, histories):
+                T_interface[group] = T_ground + history.delta_T()
+            if coupled:
+                cop, self.cop_iterations[i] = self.solve_cop(Q_b, T_interface, is_heating, cop, tol, max_iter)
+            Q_g = self.get_instantaneous_ground_load(Q_b, cop, is_heating)
+            Q_hp = GSHP.get_elec_consumption(cop, Q_b)
+            for group, history in zip(self.groups, histories):
+                history.append(Q_g[group])
+            T_w = self.get_outlet_water_temperature(T_interface, Q_g)
+            system_props.append(t, Q_b, T_interface, T_w, cop, Q_g, Q_hp)
+            cop = GSHP.graph_cop(T_w)
+
+        return system_props
@@ -0,0 +1,339 @@
+import os
+import math
+import sys
+import time
+import contextlib
+import subprocess
+import tracemalloc
+import numpy as np
+from .GSHP import GSHP, seconds_in_year
+from .superposition import Superposition, AggregatedSuperposition, kernel_cache
+
+golden_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_golden.npz')
+reference_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'reference_gshp.py')
+
+
+# Benchmarks of the GSHP and BESS hot paths, with a regression check of their outputs against stored golden results.
+
+
+def barton_house_array() -> GSHP:
+
+    """The borehole array used in main.py."""
+
+    return GSHP(
+        num_boreholes=11,
+        depth=190,
+        radius=0.06,
+        soil_density=2200,
+        soil_heat_capacity=710,
+        soil_thermal_conductivity=2.3,
+        grout_density=1400,
+        grout_heat_capacity=800,
+        grout_thermal_conductivity=1.4
+    )
+
+
+def replay(bh_array: GSHP, history, t_n: float, time_step: float, T_ground: float):
+
+    """Run the model_single_bh time loop with the given superposition history. Returns interface temps."""
+
+    n = math.floor(t_n/time_step)
+    T_interface = np.zeros(n+1)
+    cop = GSHP.graph_cop(bh_array.get_outlet_water_temperature(T_ground, 0))
+    for i in range(n+1):
+        Q_b = GSHP.get_building_load(i*time_step)/bh_array.num_boreholes
+        Q_g = bh_array.get_instantaneous_ground_load(Q_b, cop, True)
+        T_interface[i] = T_ground + history.delta_T()
+        history.append(Q_g)
+        cop = GSHP.graph_cop(bh_array.get_outlet_water_temperature(T_interface[i], Q_g))
+
+    return T_interface
+
+
+def bench_aggregation(years: list[int] = [1, 10, 50], time_step: float = 8*3600, cells_per_level: int = 5):
+
+    """Print wall time of both superposition paths and the max error of the fast path."""
+
+    bh_array = barton_house_array()
+    args = (bh_array.r, bh_array.k_g, bh_array.alpha_g, bh_array.L, time_step)
+
+    for n_years in years:
+        t_n = n_years*seconds_in_year
+        n = math.floor(t_n/time_step)
+
+        start = time.perf_counter()
+        exact = replay(bh_array, Superposition(*args, n+1), t_n, time_step, 288)
+        t_exact = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = replay(bh_array, AggregatedSuperposition(*args, n+1, cells_per_level), t_n, time_step, 288)
+        t_fast = time.perf_counter() - start
+
+        print(f'{n_years} years ({n+1} steps): exact {t_exact:.2f}s, fast {t_fast:.2f}s, max error {np.max(np.abs(exact-fast)):.2e} K')
+
+
+def bench_import(module: str = 'Thermodynamics', repeats: int = 5) -> float:
+
+    """Print and return the best cold-start import time of module, each in a fresh interpreter."""
+
+    code = f'import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)'
+    times = [float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout) for _ in range(repeats)]
+    print(f'import {module}: {min(times)*1000:.0f} ms (best of {repeats})')
+
+    return min(times)
+
+
+def model_case(time_step: float, years: int, fast: bool):
+    def run():
+        system_props = barton_house_array().model_single_bh(years*seconds_in_year, time_step, 288, True, fast=fast, as_frame=False)
+        return {column: system_props[column] for column in ['COP', 'Interface temp (K)']}
+    return run
+
+
+def optimise_case(fd: bool | str, time_step: float, num_radii: int):
+    def run():
+        bh_array = barton_house_array()
+        r_crit, _ = bh_array.optimise_borehole_config(50, 288, time_step, True, fd, num_radii=num_radii, verbose=False)
+        return {'r_crit': np.array([r_crit]), 'Ground temps (K)': bh_array.ground_temps}
+    return run
+
+
+def bess_case(steps_per_hour: int, num_batteries: int):
+    def run():
+        from BESS.dispatch import annual_series, dispatch
+        from BESS.new_battery_calcs_summer_adjusted import (
+            monthly_consumption, daily_generation, days_in_month, hourly_consumption_profile, hourly_generation_profile
+        )
+        consumption, generation, month = annual_series(
+            monthly_consumption, daily_generation, days_in_month, hourly_consumption_profile, hourly_generation_profile, steps_per_hour
+        )
+        capacity = np.linspace(10, 100, num_batteries)
+        soc, unmet, _ = dispatch(consumption, generation, capacity, 0.85)
+        monthly_unmet = np.stack([unmet[..., month == m].sum(axis=-1) for m in range(1, 13)], axis=-1)
+        return {'Monthly unmet (kWh)': monthly_unmet, 'SOC (kWh)': soc}
+    return run
+
+
+def bench_cases() -> dict:
+
+    """Returns the benchmark cases by name. Each case runs one entry point and returns its outputs by name."""
+
+    cases = {}
+    for time_step in [8*3600, 2*3600]:
+        for years in [1, 5]:
+            for fast in [False, True]:
+                cases[f'model_single_bh[dt={time_step//3600}h,years={years},fast={fast}]'] = model_case(time_step, years, fast)
+    for fd, time_step in [(False, seconds_in_year/900), (True, 3000), ('cn', 12*3600)]:
+        for num_radii in [50, 100]:
+            cases[f'optimise_borehole_config[fd={fd},radii={num_radii}]'] = optimise_case(fd, time_step, num_radii)
+    for steps_per_hour in [1, 4]:
+        for num_batteries in [1, 64]:
+            cases[f'bess_dispatch[steps_per_hour={steps_per_hour},batteries={num_batteries}]'] = bess_case(steps_per_hour, num_batteries)
+
+    return cases
+
+
+def baseline_cases(reference: str = reference_path) -> dict:
+
+    """
+    Returns the benchmark cases the original code can run, run with the reference implementation at reference.
+
+    The reference is the GSHP.py of the first commit, vendored as tests/reference_gshp.py (see its header for the
+    patches made to it), so a source checkout is needed. The original model_single_bh has no fast mode and its
+    optimise_borehole_config always reports 100 radii with explicit FD or the line source, so only those cases
+    are covered. Its prints are discarded.
+    """
+
+    import io
+    import importlib.util
+
+    if not os.path.exists(reference):
+        raise FileNotFoundError(f'{reference} not found, the baseline golden results need a source checkout')
+    spec = importlib.util.spec_from_file_location('reference_gshp', reference)
+    original = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(original)
+
+    def original_array():
+        return original.GSHP(
+            num_boreholes=11,
+            depth=190,
+            radius=0.06,
+            soil_density=2200,
+            soil_heat_capacity=710,
+            soil_thermal_conductivity=2.3,
+            grout_density=1400,
+            grout_heat_capacity=800,
+            grout_thermal_conductivity=1.4
+        )
+
+    def model(time_step, years):
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                system_props = original_array().model_single_bh(years*seconds_in_year, time_step, 288, True)
+            return {column: system_props[column].to_numpy(dtype=float) for column in ['COP', 'Interface temp (K)']}
+        return run
+
+    def optimise(fd, time_step):
+        def run():
+            bh_array = original_array()
+            with contextlib.redirect_stdout(io.StringIO()):
+                r_crit, _ = bh_array.optimise_borehole_config(50, 288, time_step, True, fd)
+            return {'r_crit': np.array([r_crit]), 'Ground temps (K)': bh_array.ground_temps}
+        return run
+
+    cases = {}
+    for time_step in [8*3600, 2*3600]:
+        for years in [1, 5]:
+            cases[f'model_single_bh[dt={time_step//3600}h,years={years},fast=False]'] = model(time_step, years)
+    for fd, time_step in [(False, seconds_in_year/900), (True, 3000)]:
+        cases[f'optimise_borehole_config[fd={fd},radii=100]'] = optimise(fd, time_step)
+
+    return cases
+
+
+def store_baseline_golden(reference: str = reference_path):
+
+    """
+    Store the golden results of baseline_cases, so the optimised hot paths are checked against the original code.
+
+    run_suite(update_golden=True) then leaves these cases alone. Takes around ten minutes, as the original code
+    sums every past load with one expi call per term.
+    """
+
+    golden = dict(np.load(golden_path)) if os.path.exists(golden_path) else {}
+    cases = baseline_cases(reference)
+    for name, case in cases.items():
+        start = time.perf_counter()
+        for output, values in case().items():
+            golden[f'{name}/{output}'] = decimate(values)
+        print(f'{name}: stored from the original code ({time.perf_counter() - start:.0f}s)')
+
+    golden['baseline cases'] = np.array(sorted(set(cases) | set(golden.get('baseline cases', []))))
+    np.savez_compressed(golden_path, **golden)
+
+
+@contextlib.contextmanager
+def count_expi():
+
+    """Count calls to scipy.special.expi, and the points evaluated, while the context is open."""
+
+    import scipy.special
+    expi = scipy.special.expi
+    counts = {'calls': 0, 'points': 0}
+
+    def counted(x, *args, **kwargs):
+        counts['calls'] += 1
+        counts['points'] += np.size(x)
+        return expi(x, *args, **kwargs)
+
+    scipy.special.expi = counted
+    try:
+        yield counts
+    finally:
+        scipy.special.expi = expi
+
+
+@contextlib.contextmanager
+def cold_kernel_cache():
+
+    """Run with an empty in-memory kernel cache and no disk cache, so every case pays for its own kernels."""
+
+    cache_dir = kernel_cache.cache_dir
+    kernel_cache.cache_dir = None
+    kernel_cache.clear()
+    try:
+        yield
+    finally:
+        kernel_cache.cache_dir = cache_dir
+        kernel_cache.clear()
+
+
+def decimate(values: np.ndarray, max_points: int = 1000) -> np.ndarray:
+
+    """Keep at most max_points samples along the last axis, so golden results stay small."""
+
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0:
+        return values
+    return values[..., ::math.ceil(values.shape[-1]/max_points)]
+
+
+def run_suite(pattern: str = '', update_golden: bool = False, rtol: float = 1E-9, atol: float = 1E-9, repeats: int = 1, csv_path: str = None):
+
+    """
+    Run every benchmark case whose name contains pattern and check its outputs against the golden results.
+
+    Records the best wall time of repeats runs, then the peak traced memory and expi usage of one more run. Each
+    run starts from a cold kernel cache. An output passes if it matches its golden result within rtol and atol
+    (NaN matching NaN).
+    update_golden = store the outputs as the new golden results instead of checking them. Cases whose golden
+    results come from the original code (see store_baseline_golden) are still checked
+    Returns the results table, which is also printed and optionally written to csv_path.
+    """
+
+    import pandas as pd
+    import scipy.special  # Keep the first case from paying for the import
+
+    golden = dict(np.load(golden_path)) if os.path.exists(golden_path) else {}
+    from_baseline = set(golden.get('baseline cases', []))
+    rows = []
+    for name, case in bench_cases().items():
+        if pattern not in name:
+            continue
+
+        wall_time = math.inf
+        for _ in range(repeats):
+            with cold_kernel_cache():
+                start = time.perf_counter()
+                case()
+                wall_time = min(wall_time, time.perf_counter() - start)
+
+        with cold_kernel_cache(), count_expi() as counts:
+            tracemalloc.start()
+            outputs = case()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        status, max_error = 'ok', 0.0
+        for output, values in outputs.items():
+            key = f'{name}/{output}'
+            values = decimate(values)
+            if update_golden and name not in from_baseline:
+                golden[key] = values
+                status = 'updated'
+            elif key not in golden:
+                status = 'no golden'
+            elif golden[key].shape != values.shape:
+                status = 'FAIL'
+                max_error = math.inf
+            else:
+                max_error = max(max_error, float(np.nanmax(np.append(np.abs(values - golden[key]), 0))))
+                if not np.allclose(values, golden[key], rtol=rtol, atol=atol, equal_nan=True):
+                    status = 'FAIL'
+        if status == 'ok' and name in from_baseline:
+            status = 'ok vs original'
+
+        rows.append({
+            'Case': name,
+            'Wall time (s)': wall_time,
+            'Peak memory (MB)': peak_memory/1E6,
+            'expi calls': counts['calls'],
+            'expi points': counts['points'],
+            'Max abs error': max_error,
+            'Status': status,
+        })
+        print(f"{name}: {wall_time:.3f}s, {peak_memory/1E6:.1f} MB, {counts['calls']} expi calls, {status}")
+
+    if update_golden:
+        np.savez_compressed(golden_path, **golden)
+
+    table = pd.DataFrame(rows)
+    if csv_path:
+        table.to_csv(csv_path, index=False)
+
+    return table
+
+
+if __name__ == '__main__':
+    bench_import()
+    run_suite()
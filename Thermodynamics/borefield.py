@@ -0,0 +1,86 @@
+import math
+import numpy as np
+from .GSHP import GSHP
+from .loads import LoadProfile, AnalyticLoad
+from .superposition import Superposition, AggregatedSuperposition
+from .results import SimulationResults
+
+
+def rectangular_grid(nx: int, ny: int, spacing: float) -> np.ndarray:
+
+    """Returns the (x, y) coordinates of an nx by ny grid of boreholes."""
+
+    x, y = np.meshgrid(np.arange(nx)*spacing, np.arange(ny)*spacing)
+
+    return np.column_stack([x.ravel(), y.ravel()])
+
+
+class Borefield:
+
+    """
+    Model a field of identical boreholes with thermal interaction between them.
+
+    Each borehole takes an equal share of the building load. Its wall temperature is its own line-source response
+    through the grout plus the responses through the soil of every other borehole at their pairwise distance,
+    using the far-field form of the line source. Distances are deduplicated, so a regular grid of 100+ boreholes
+    only needs a kernel per distinct spacing.
+    """
+
+    def __init__(self, bh_array: GSHP, coordinates: np.ndarray, decimals: int = 6) -> None:
+        self.bh_array = bh_array
+        self.coordinates = np.asarray(coordinates, dtype=float)
+        self.num_boreholes = len(self.coordinates)
+
+        diffs = self.coordinates[:, None, :] - self.coordinates[None, :, :]
+        distances = np.round(np.hypot(diffs[..., 0], diffs[..., 1]), decimals)
+        off_diagonal = ~np.eye(self.num_boreholes, dtype=bool)
+        self.distances, index = np.unique(distances[off_diagonal], return_inverse=True)
+
+        # counts[i, d] = number of neighbours of borehole i at distance self.distances[d]
+        rows = np.nonzero(off_diagonal)[0]
+        self.counts = np.zeros((self.num_boreholes, len(self.distances)))
+        np.add.at(self.counts, (rows, index.ravel()), 1)
+
+    def model(self, t_n: float, time_step: float, T_ground: float, is_heating: bool, fast: bool = False, cells_per_level: int = 5, coupled: bool = False, tol: float = 1E-8, max_iter: int = 50, building_load: LoadProfile = None, block_size: int = 1024) -> SimulationResults:
+
+        """
+        Like GSHP.model_single_bh for the whole field. Each column of the results has shape (n, num_boreholes).
+
+        The heat pump sees the mixed return flow, so the COP follows the mean outlet temperature of the field.
+        coupled, tol, max_iter = as in GSHP.model_single_bh, solved against the mean wall temperature
+        building_load, block_size = as in GSHP.model_single_bh
+        """
+
+        bh = self.bh_array
+        n = math.floor(t_n/time_step)
+        building_load = building_load or AnalyticLoad()
+        if fast:
+            own = AggregatedSuperposition(bh.r, bh.k_g, bh.alpha_g, bh.L, time_step, n+1, cells_per_level)
+            neighbours = AggregatedSuperposition(self.distances, bh.k_s, bh.alpha_s, bh.L, time_step, n+1, cells_per_level, far_field=True)
+        else:
+            own = Superposition(bh.r, bh.k_g, bh.alpha_g, bh.L, time_step, n+1)
+            neighbours = Superposition(self.distances, bh.k_s, bh.alpha_s, bh.L, time_step, n+1, far_field=True)
+        cop = GSHP.graph_cop(bh.get_outlet_water_temperature(T_ground, 0))
+
+        system_props = SimulationResults(n+1, self.num_boreholes)
+        self.cop_iterations = np.zeros(n+1, dtype=int)
+
+        for i in range(n+1):
+            t = i*time_step
+            if i % block_size == 0:
+                loads = building_load.block(np.arange(i, min(i+block_size, n+1))*time_step)
+            Q_b = loads[i % block_size]/self.num_boreholes
+            T_interface = T_ground + own.delta_T()
+            if len(self.distances):
+                T_interface = T_interface + self.counts @ neighbours.delta_T()
+            if coupled:
+                cop, self.cop_iterations[i] = bh.solve_cop(Q_b, np.mean(T_interface), is_heating, cop, tol, max_iter)
+            Q_g = bh.get_instantaneous_ground_load(Q_b, cop, is_heating)
+            Q_hp = GSHP.get_elec_consumption(cop, Q_b)
+            own.append(Q_g)
+            neighbours.append(Q_g)
+            T_w = bh.get_outlet_water_temperature(T_interface, Q_g)
+            system_props.append(t, Q_b, T_interface, T_w, cop, Q_g, Q_hp)
+            cop = GSHP.graph_cop(np.mean(T_w))
+
+        return system_props
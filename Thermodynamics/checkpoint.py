@@ -0,0 +1,42 @@
+import os
+import numpy as np
+
+
+# Compact binary checkpoints of simulation state, as uncompressed .npz archives of named arrays.
+
+
+def save_checkpoint(path: str, state: dict):
+
+    """
+    Write state to path. Nested dicts are flattened to 'outer/inner' keys.
+
+    The file is written via a temporary file, so a crash mid-write leaves the previous checkpoint intact.
+    """
+
+    arrays = {}
+    for key, value in state.items():
+        if isinstance(value, dict):
+            arrays.update({f'{key}/{inner}': inner_value for inner, inner_value in value.items()})
+        else:
+            arrays[key] = value
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> dict:
+
+    """Read a checkpoint written by save_checkpoint, nesting 'outer/inner' keys back into dicts."""
+
+    state = {}
+    with np.load(path) as arrays:
+        for key in arrays.files:
+            if '/' in key:
+                outer, inner = key.split('/', 1)
+                state.setdefault(outer, {})[inner] = arrays[key]
+            else:
+                state[key] = arrays[key]
+
+    return state
@@ -0,0 +1,119 @@
+import math
+import numpy as np
+from .GSHP import GSHP, seconds_in_year
+from .loads import LoadProfile, SeriesLoad
+from BESS.dispatch import annual_series, dispatch
+
+flow_columns = ['Time (s)', 'HP elec (kWh)', 'Base load (kWh)', 'PV generation (kWh)', 'SOC (kWh)', 'Grid import (kWh)', 'Curtailed (kWh)']
+
+
+# Co-simulation of the heat pump, PV and battery on one timeline.
+
+
+def cosimulate(
+        bh_array: GSHP,
+        t_n: float,
+        time_step: float,
+        T_ground: float,
+        base_load: LoadProfile,
+        pv_generation: LoadProfile,
+        battery_capacity,
+        battery_efficiency,
+        building_load: LoadProfile = None,
+        fast: bool = True,
+        soc_init=0,
+        block_size: int = 8760,
+    ) -> tuple:
+
+    """
+    Run the GSHP and feed its electricity, plus the base load, through PV and battery dispatch. Returns the GSHP
+    results and a dict of per-step energy flows (see flow_columns).
+
+    base_load, pv_generation = electrical load and PV output (W) as load sources (see loads.py)
+    battery_capacity, battery_efficiency = as in BESS.dispatch, arrays giving one dispatch per battery
+
+    The heat pump does not depend on the battery, so the GSHP runs first (with load aggregation if fast) and the
+    electrical side follows in blocks of block_size steps: loads and generation are evaluated for the whole block
+    and the battery dispatched over it in one vectorised pass, carrying the state of charge into the next block.
+    time_step should not be longer than the sampling interval of base_load and pv_generation.
+    """
+
+    n = math.floor(t_n/time_step)
+    hours = time_step/3600
+    system_props = bh_array.model_single_bh(t_n, time_step, T_ground, True, fast=fast, as_frame=False, building_load=building_load)
+    hp_elec = system_props['Elec per BH (W)']*bh_array.num_boreholes/1000*hours
+
+    shape = np.broadcast_shapes(np.shape(battery_capacity), np.shape(battery_efficiency), np.shape(soc_init)) + (n+1,)
+    flows = {column: np.zeros(shape if column in flow_columns[4:] else n+1) for column in flow_columns}
+    flows['Time (s)'] = system_props['Time (s)']
+    flows['HP elec (kWh)'] = hp_elec
+    soc = soc_init
+
+    for start in range(0, n+1, block_size):
+        block = slice(start, min(start+block_size, n+1))
+        t = flows['Time (s)'][block]
+        flows['Base load (kWh)'][block] = base_load.block(t)/1000*hours
+        flows['PV generation (kWh)'][block] = pv_generation.block(t)/1000*hours
+        consumption = hp_elec[block] + flows['Base load (kWh)'][block]
+        soc_block, unmet, curtailed = dispatch(consumption, flows['PV generation (kWh)'][block], battery_capacity, battery_efficiency, soc)
+        flows['SOC (kWh)'][..., block] = soc_block
+        flows['Grid import (kWh)'][..., block] = unmet
+        flows['Curtailed (kWh)'][..., block] = curtailed
+        soc = soc_block[..., -1]
+
+    return system_props, flows
+
+
+def flow_summary(flows: dict) -> dict:
+
+    """Returns the total energy flows of a cosimulate run and the share of demand met on site."""
+
+    demand = flows['HP elec (kWh)'].sum() + flows['Base load (kWh)'].sum()
+    grid_import = flows['Grid import (kWh)'].sum(axis=-1)
+
+    return {
+        'HP elec (kWh)': flows['HP elec (kWh)'].sum(),
+        'Base load (kWh)': flows['Base load (kWh)'].sum(),
+        'PV generation (kWh)': flows['PV generation (kWh)'].sum(),
+        'Grid import (kWh)': grid_import,
+        'Curtailed (kWh)': flows['Curtailed (kWh)'].sum(axis=-1),
+        'Self-sufficiency (%)': (1 - grid_import/demand)*100,
+    }
+
+
+def main(years: int = 10):
+
+    """Co-simulate the Barton House array with the PV and battery inputs of the BESS model."""
+
+    from BESS import new_battery_calcs_summer_adjusted as bess
+
+    base_load, pv_generation, _ = annual_series(
+        bess.monthly_consumption, bess.daily_generation, bess.days_in_month,
+        bess.hourly_consumption_profile, bess.hourly_generation_profile,
+    )
+    system_props, flows = cosimulate(
+        GSHP(
+            num_boreholes=11,
+            depth=190,
+            radius=0.06,
+            soil_density=2200,
+            soil_heat_capacity=710,
+            soil_thermal_conductivity=2.3,
+            grout_density=1400,
+            grout_heat_capacity=800,
+            grout_thermal_conductivity=1.4
+        ),
+        t_n=years*seconds_in_year,
+        time_step=3600,
+        T_ground=288,
+        base_load=SeriesLoad(base_load*1000),
+        pv_generation=SeriesLoad(pv_generation*1000),
+        battery_capacity=bess.battery_capacity,
+        battery_efficiency=bess.battery_efficiency,
+    )
+    for name, value in flow_summary(flows).items():
+        print(f'{name}: {value:.1f}')
+
+
+if __name__ == '__main__':
+    main()
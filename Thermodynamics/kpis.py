@@ -0,0 +1,134 @@
+import numpy as np
+from .loads import month_of
+from .results import iter_chunks
+
+seconds_in_day = 24*3600
+extremes = ['Max HP elec demand (kW)', 'Max ground load (kW)', 'Min COP', 'Monthly max HP elec demand (kW)']
+
+
+# Energy, demand and cost KPIs of a simulation, accumulated chunk by chunk.
+
+
+def mean_price(t: np.ndarray, time_step: float, tariff) -> np.ndarray:
+
+    """
+    Returns the mean price (£/kWh) over each step [t, t + time_step).
+
+    tariff = a flat price, or a time-of-use array of prices splitting each day into equal periods, e.g. 24 hourly
+    or 48 half-hourly prices starting at 00:00. Steps spanning several periods are charged the time-weighted mean.
+    """
+
+    t = np.asarray(t, dtype=float)
+    prices = np.asarray(tariff, dtype=float)
+    if prices.ndim == 0:
+        return np.full(t.shape, float(prices))
+
+    # Integral of the price from 00:00 on day 0, piecewise linear within a day
+    period = seconds_in_day/len(prices)
+    day_cost = np.concatenate([[0], np.cumsum(prices)*period])
+    day_times = np.arange(len(prices)+1)*period
+
+    def cumulative(x):
+        return (x//seconds_in_day)*day_cost[-1] + np.interp(x % seconds_in_day, day_times, day_cost)
+
+    return (cumulative(t + time_step) - cumulative(t))/time_step
+
+
+def sampled_label(name: str) -> str:
+
+    """Returns the name of a KPI taken from sampled steps only, e.g. 'Min COP, sampled'."""
+
+    return name.replace(' (', ', sampled (') if ' (' in name else f'{name}, sampled'
+
+
+def summarise(results, num_boreholes: int, time_step: float, tariff=0.10, chunk_size: int = 8760, sampled: bool = False) -> dict:
+
+    """
+    Returns the energy, demand and cost KPIs of a run of GSHP.model_single_bh.
+
+    results = SimulationResults, ResultsFile, the DataFrame of a run, or any iterable of chunks as yielded by
+    results.iter_chunks, so streamed runs are summarised one chunk at a time
+    num_boreholes = boreholes sharing the load, the results being per borehole
+    time_step = time each recorded step stands for (s), e.g. time_step*every for decimated output. ResultsFile.summary
+    works this out itself
+    tariff = electricity price (£/kWh), flat or time-of-use (see mean_price)
+    sampled = the results only hold some of the steps run, so peaks and the min COP are only those of the kept
+    steps and are labelled as sampled
+
+    Energies integrate each step's power over time_step. The current cost prices the building load as if met
+    by direct electric heating at the same tariff. Monthly values are indexed Jan to Dec, summed over years for
+    multi-year runs. Batched results give one value per configuration.
+    """
+
+    if isinstance(results, (list, tuple)) or not hasattr(results, '__getitem__'):
+        chunks = results
+    else:
+        chunks = iter_chunks(results, chunk_size)
+
+    hours = time_step/3600
+    acc = None
+    for chunk in chunks:
+        t = np.asarray(chunk['Time (s)'], dtype=float)
+        if t.ndim > 1:
+            t = t[:, 0]  # Batched runs share one timeline
+        heat = np.asarray(chunk['Building load per BH (W)'])*num_boreholes/1000  # kW
+        elec = np.asarray(chunk['Elec per BH (W)'])*num_boreholes/1000
+        ground = np.asarray(chunk['Ground load per BH (W)'])*num_boreholes/1000
+        cop = np.asarray(chunk['COP'])
+        month = month_of(t)
+        price = mean_price(t, time_step, tariff).reshape(t.shape + (1,)*(elec.ndim-1))
+
+        if acc is None:
+            zeros = np.zeros(elec.shape[1:])
+            acc = {
+                'steps': 0,
+                'heat': zeros.copy(), 'elec': zeros.copy(), 'ground': zeros.copy(),
+                'peak_elec': np.full(elec.shape[1:], -np.inf), 'peak_ground': np.full(elec.shape[1:], -np.inf),
+                'min_cop': np.full(elec.shape[1:], np.inf),
+                'monthly_heat': np.zeros((12,) + elec.shape[1:]), 'monthly_elec': np.zeros((12,) + elec.shape[1:]),
+                'monthly_peak_elec': np.full((12,) + elec.shape[1:], -np.inf),
+                'current_cost': zeros.copy(), 'projected_cost': zeros.copy(),
+            }
+
+        acc['steps'] += len(t)
+        acc['heat'] += heat.sum(axis=0)
+        acc['elec'] += elec.sum(axis=0)
+        acc['ground'] += ground.sum(axis=0)
+        acc['peak_elec'] = np.maximum(acc['peak_elec'], elec.max(axis=0))
+        acc['peak_ground'] = np.maximum(acc['peak_ground'], ground.max(axis=0))
+        acc['min_cop'] = np.minimum(acc['min_cop'], cop.min(axis=0))
+        np.add.at(acc['monthly_heat'], month, heat)
+        np.add.at(acc['monthly_elec'], month, elec)
+        np.maximum.at(acc['monthly_peak_elec'], month, elec)
+        acc['current_cost'] += (heat*price).sum(axis=0)*hours
+        acc['projected_cost'] += (elec*price).sum(axis=0)*hours
+
+    if acc is None:
+        raise ValueError('No results to summarise')
+
+    heating_demand = acc['heat']*hours
+    elec_demand = acc['elec']*hours
+    saving = acc['current_cost'] - acc['projected_cost']
+
+    summary = {
+        'Heating demand (kWh)': heating_demand,
+        'HP elec demand (kWh)': elec_demand,
+        'Max HP elec demand (kW)': acc['peak_elec'],
+        'Avg HP elec demand (kW)': acc['elec']/acc['steps'],
+        'Max ground load (kW)': acc['peak_ground'],
+        'Avg ground load (kW)': acc['ground']/acc['steps'],
+        'Min COP': acc['min_cop'],
+        'SPF': heating_demand/elec_demand,
+        'Monthly heating demand (kWh)': acc['monthly_heat']*hours,
+        'Monthly HP elec demand (kWh)': acc['monthly_elec']*hours,
+        'Monthly max HP elec demand (kW)': np.where(np.isinf(acc['monthly_peak_elec']), np.nan, acc['monthly_peak_elec']),
+        'Current elec cost (£)': acc['current_cost'],
+        'Projected elec cost (£)': acc['projected_cost'],
+        'Projected saving (£)': saving,
+        'Projected saving (%)': saving/acc['current_cost']*100,
+    }
+
+    if sampled:
+        summary = {sampled_label(name) if name in extremes else name: value for name, value in summary.items()}
+
+    return {name: value[()] for name, value in summary.items()}
@@ -0,0 +1,166 @@
+import os
+import numpy as np
+
+seconds_in_year = 3600*24*365.2
+ons_data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ONS Data.xlsx')
+months_order = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+# Building load sources. Each one returns the load (W) for a whole block of times at once.
+
+
+def monthly_demand_stats(file_path: str = ons_data_path, total_annual_demand: float = 604921) -> tuple[np.ndarray, np.ndarray]:
+
+    """Returns the monthly mean and std of demand (kWh, Jan to Dec) scaled to the annual demand of the flats."""
+
+    import pandas as pd
+
+    ons_data = pd.read_excel(file_path, sheet_name="PyData")
+    ons_data.columns = ons_data.columns.str.strip()
+    ons_data['Month'] = pd.to_datetime(ons_data['Month'], format='%B %Y').dt.month_name().str.slice(stop=3)
+    ons_data['Domestic_Sales_kWh'] = ons_data['Domestic Sales [TWh]'] * 1e6
+
+    monthly_avg = ons_data.groupby('Month')['Domestic_Sales_kWh'].mean()
+    monthly_std = ons_data.groupby('Month')['Domestic_Sales_kWh'].std()
+    scaled_monthly_avg = (monthly_avg / monthly_avg.sum()) * total_annual_demand
+    scaled_monthly_std = (monthly_std / monthly_avg.sum()) * total_annual_demand
+
+    return scaled_monthly_avg.reindex(months_order).values, scaled_monthly_std.reindex(months_order).values
+
+
+def month_of(t: np.ndarray) -> np.ndarray:
+
+    """Returns the month index (0 to 11) of times t, in seconds since 00:00 on 01/01."""
+
+    return ((np.asarray(t) % seconds_in_year)//(seconds_in_year/12)).astype(int)
+
+
+class LoadProfile:
+
+    """
+    Base class of building load sources.
+
+    Subclasses implement block(t), returning the load at every time of the array t. The models request blocks of
+    consecutive time steps in increasing order. Sources may return one load per time, shape (len(t),), or one per
+    configuration of a batch, shape (len(t), N).
+    """
+
+    def block(self, t: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def __call__(self, t: float):
+        return self.block(np.asarray([t], dtype=float))[0]
+
+
+class AnalyticLoad(LoadProfile):
+
+    """The parabolic fit of the annual heating load, repeating every year."""
+
+    def block(self, t: np.ndarray) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        t = t - seconds_in_year*(t//seconds_in_year)
+        return 1.8E-10*(2.6E6*6-t)**2+53056
+
+
+class MonthlyLoad(LoadProfile):
+
+    """
+    A constant load through each month, from monthly energies (kWh, Jan to Dec), repeating every year.
+
+    monthly_energy may also have shape (N, 12), one profile per configuration of a batch.
+    """
+
+    def __init__(self, monthly_energy) -> None:
+        hours_in_month = seconds_in_year/12/3600
+        self.monthly_load = np.asarray(monthly_energy, dtype=float)*1000/hours_in_month
+
+    @classmethod
+    def from_ons(cls, file_path: str = ons_data_path, total_annual_demand: float = 604921):
+
+        """The mean monthly profile of the ONS domestic sales data, scaled to the annual demand of the flats."""
+
+        return cls(monthly_demand_stats(file_path, total_annual_demand)[0])
+
+    def block(self, t: np.ndarray) -> np.ndarray:
+        return self.monthly_load[..., month_of(t)].T
+
+
+class SeriesLoad(LoadProfile):
+
+    """A load series held in memory, sampled every interval seconds from t = 0 and repeating once it runs out."""
+
+    def __init__(self, values, interval: float = 3600) -> None:
+        self.values = np.asarray(values, dtype=float)
+        self.interval = interval
+
+    def block(self, t: np.ndarray) -> np.ndarray:
+        return self.values[(np.asarray(t, dtype=float)//self.interval).astype(int) % len(self.values)]
+
+
+class ScaledProfile(LoadProfile):
+
+    """Another load source multiplied by a constant factor, e.g. to size for a larger or smaller building."""
+
+    def __init__(self, profile: LoadProfile, scale: float) -> None:
+        self.profile = profile
+        self.scale = scale
+
+    def block(self, t: np.ndarray) -> np.ndarray:
+        return self.scale*self.profile.block(t)
+
+
+class MeterLoad(LoadProfile):
+
+    """
+    A measured load series sampled every interval seconds from t = 0, e.g. hourly or half-hourly meter data.
+
+    The column is read lazily from a CSV or Parquet file in chunks of chunksize rows, and only the samples of the
+    current block are kept, so a year or more of metered data never has to be in memory at once. Each time takes
+    the sample of the interval it falls in. scale converts the column to W, e.g. 1000 for kW. Requesting an earlier
+    time than the current block restarts the read from the top of the file.
+    """
+
+    def __init__(self, file_path: str, column: str, interval: float = 3600, scale: float = 1, chunksize: int = 8760) -> None:
+        self.file_path = file_path
+        self.column = column
+        self.interval = interval
+        self.scale = scale
+        self.chunksize = chunksize
+        self._rewind()
+
+    def _rewind(self):
+        self._chunks = self._read_chunks()
+        self._buffer = np.zeros(0)
+        self._start = 0  # Sample index of self._buffer[0]
+
+    def _read_chunks(self):
+        if self.file_path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(self.file_path).iter_batches(batch_size=self.chunksize, columns=[self.column]):
+                yield batch.column(0).to_numpy(zero_copy_only=False)
+        else:
+            import pandas as pd
+            for chunk in pd.read_csv(self.file_path, usecols=[self.column], chunksize=self.chunksize):
+                yield chunk[self.column].to_numpy()
+
+    def _discard_before(self, index: int):
+        drop = min(index - self._start, len(self._buffer))
+        self._buffer = self._buffer[drop:]
+        self._start += drop
+
+    def block(self, t: np.ndarray) -> np.ndarray:
+        index = (np.asarray(t, dtype=float)//self.interval).astype(int)
+        if index.size == 0:
+            return np.zeros(0)
+        if index.min() < self._start:
+            self._rewind()
+
+        self._discard_before(index.min())
+        while self._start + len(self._buffer) <= index.max():
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                raise ValueError(f'{self.file_path} has {self._start + len(self._buffer)} samples, too few to reach t = {index.max()*self.interval} s')
+            self._buffer = np.concatenate([self._buffer, np.asarray(chunk, dtype=float)])
+            self._discard_before(index.min())
+
+        return self.scale*self._buffer[index - self._start]
@@ -0,0 +1,139 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .GSHP import GSHP
+from .batch import GSHPBatch
+from .loads import LoadProfile, AnalyticLoad, month_of, monthly_demand_stats, ons_data_path, seconds_in_year
+from BESS.dispatch import dispatch
+
+
+# Samples annual building load profiles from the ONS monthly spread and runs them through the GSHP and BESS models.
+
+
+class ScaledLoad(LoadProfile):
+
+    """Building load of each scenario: the analytic fit scaled by that scenario's sampled monthly factor."""
+
+    def __init__(self, scales: np.ndarray) -> None:
+        self.scales = scales
+
+    def block(self, t: np.ndarray) -> np.ndarray:
+        return AnalyticLoad().block(t)[:, None]*self.scales[:, month_of(t)].T
+
+
+def hourly_energy(power: np.ndarray, time_step: float, max_hours: int = None) -> np.ndarray:
+
+    """
+    Returns the energy (kWh) of each whole hour from t = 0, given the power (kW) held over each time step.
+
+    Works for steps shorter or longer than an hour, or not dividing it, by interpolating the cumulative energy at
+    the hour boundaries. power may have further axes after the time axis. Stops at max_hours if given.
+    """
+
+    num_steps = len(power)
+    num_hours = math.floor(num_steps*time_step/3600)
+    if max_hours is not None:
+        num_hours = min(num_hours, max_hours)
+
+    cumulative = np.concatenate([np.zeros((1,) + power.shape[1:]), np.cumsum(power, axis=0)*time_step/3600])
+    position = np.arange(num_hours+1)*3600/time_step  # Hour boundaries in steps
+    index = np.minimum(position.astype(int), num_steps-1)
+    fraction = (position - index).reshape((-1,) + (1,)*(power.ndim-1))
+    energy = cumulative[index] + fraction*(cumulative[index+1] - cumulative[index])
+
+    return np.diff(energy, axis=0)
+
+
+def run_scenarios(gshp_args: dict, scales: np.ndarray, sim_args: dict, pv_generation: np.ndarray, battery_capacity: float, battery_efficiency: float) -> dict:
+
+    """Simulate one batch of scenarios, one per row of scales. Returns the per-scenario metrics."""
+
+    bh_array = GSHP(**gshp_args)
+    batch = GSHPBatch([bh_array]*len(scales))
+    system_props = batch.model_single_bh(**sim_args, building_load=ScaledLoad(scales))
+
+    hours_per_step = sim_args['time_step']/3600
+    elec = system_props['Elec per BH (W)']*bh_array.num_boreholes/1000  # kW per scenario
+    metrics = {
+        'Annual HP elec (kWh)': elec.sum(axis=0)*hours_per_step*seconds_in_year/sim_args['t_n'],
+        'Peak HP elec (kW)': elec.max(axis=0),
+        'Min COP': system_props['COP'].min(axis=0),
+        'Min interface temp (K)': system_props['Interface temp (K)'].min(axis=0),
+    }
+
+    if pv_generation is not None:
+        hourly_elec = hourly_energy(elec, sim_args['time_step'], len(pv_generation)).T
+        _, unmet, _ = dispatch(hourly_elec, pv_generation[:hourly_elec.shape[1]], battery_capacity, battery_efficiency)
+        metrics['Grid import (kWh)'] = unmet.sum(axis=-1)
+
+    return metrics
+
+
+def run_monte_carlo(
+        gshp_args: dict,
+        num_scenarios: int = 10000,
+        t_n: float = seconds_in_year,
+        time_step: float = 8*3600,
+        T_ground: float = 288,
+        fast: bool = False,
+        pv_generation: np.ndarray = None,
+        battery_capacity: float = 0,
+        battery_efficiency: float = 0.85,
+        file_path: str = ons_data_path,
+        seed: int = 0,
+        chunk_size: int = 500,
+        max_workers: int = None,
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+
+    """
+    Sample num_scenarios annual load profiles and simulate them. Returns per-scenario metrics and a percentile summary.
+
+    Each scenario draws every month's demand from a normal distribution with the ONS mean and std, and scales
+    the analytic building load by the ratio to the mean in that month. Scenarios run as GSHPBatch batches of
+    chunk_size across a process pool. If pv_generation (kWh per hour) is given, the heat pump's hourly electricity
+    is also dispatched against it with a battery of battery_capacity, and the grid import reported.
+
+    The summary rows P50/P90/P99 are the levels only exceeded in the adverse direction 50/10/1% of the time,
+    i.e. upper percentiles of demand and lower percentiles of COP and temperature.
+    """
+
+    mean, std = monthly_demand_stats(file_path)
+    rng = np.random.default_rng(seed)
+    scales = np.maximum(rng.normal(mean, std, size=(num_scenarios, 12)), 0)/mean
+
+    sim_args = dict(t_n=t_n, time_step=time_step, T_ground=T_ground, is_heating=True, fast=fast)
+    chunks = [scales[start:start+chunk_size] for start in range(0, num_scenarios, chunk_size)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_scenarios, gshp_args, chunk, sim_args, pv_generation, battery_capacity, battery_efficiency) for chunk in chunks]
+        results = [future.result() for future in futures]
+
+    metrics = pd.DataFrame({name: np.concatenate([result[name] for result in results]) for name in results[0]})
+
+    summary = {}
+    for name in metrics.columns:
+        lower_is_worse = name.startswith('Min')
+        quantiles = [0.5, 0.1, 0.01] if lower_is_worse else [0.5, 0.9, 0.99]
+        summary[name] = metrics[name].quantile(quantiles).values
+    summary = pd.DataFrame(summary, index=['P50', 'P90', 'P99'])
+
+    return metrics, summary
+
+
+def main(num_scenarios: int = 10000):
+    metrics, summary = run_monte_carlo(dict(
+        num_boreholes=11,
+        depth=190,
+        radius=0.06,
+        soil_density=2200,
+        soil_heat_capacity=710,
+        soil_thermal_conductivity=2.3,
+        grout_density=1400,
+        grout_heat_capacity=800,
+        grout_thermal_conductivity=1.4
+    ), num_scenarios=num_scenarios)
+    print(summary)
+
+
+if __name__ == '__main__':
+    main()
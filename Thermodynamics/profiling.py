@@ -0,0 +1,109 @@
+import json
+import time
+from collections import defaultdict
+from .superposition import kernel_cache
+
+
+class Profiler:
+
+    """
+    Per-phase timers and counters for GSHP runs.
+
+    Pass one to GSHP.model_single_bh or GSHP.optimise_borehole_config and run them inside `with profiler:`. The time
+    loop calls lap(phase) after each phase, which books the time since the previous lap to that phase. Kernel cache
+    hits, misses and evaluated kernel points are counted between start and stop. capture = 'cprofile' or
+    'pyinstrument' also records a full profile of the block, saved with save_capture. Runs without a profiler
+    skip all of this.
+    """
+
+    def __init__(self, capture: str = None) -> None:
+        self.capture = capture
+        self.timers = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.wall_time = 0.0
+        self.cache_stats = {}
+        self._capture = None
+        self._last = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._cache_start = (kernel_cache.hits, kernel_cache.misses, kernel_cache.evaluated)
+        if self.capture == 'cprofile':
+            import cProfile
+            self._capture = cProfile.Profile()
+            self._capture.enable()
+        elif self.capture == 'pyinstrument':
+            from pyinstrument import Profiler as Sampler
+            self._capture = Sampler()
+            self._capture.start()
+        elif self.capture:
+            raise ValueError(f"capture must be 'cprofile' or 'pyinstrument', not {self.capture!r}")
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        if self._last is None:
+            raise RuntimeError('Profiler has not been started, run the model inside `with profiler:` or call start() first')
+        now = time.perf_counter()
+        self.timers[phase] += now - self._last
+        self._last = now
+
+    def count(self, name: str, k: int = 1):
+        self.counts[name] += k
+
+    def stop(self):
+        self.wall_time += time.perf_counter() - self._start
+        if self.capture == 'cprofile':
+            self._capture.disable()
+        elif self.capture == 'pyinstrument':
+            self._capture.stop()
+
+        hits, misses, evaluated = (now - start for now, start in zip((kernel_cache.hits, kernel_cache.misses, kernel_cache.evaluated), self._cache_start))
+        self.cache_stats = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits/(hits + misses) if hits + misses else None,
+            'kernel_points_evaluated': evaluated,
+        }
+
+    def report(self) -> dict:
+
+        """Returns the timers, counters and kernel cache statistics as a JSON-serialisable dict."""
+
+        return {
+            'wall_time': self.wall_time,
+            'phases': {
+                phase: {'time': elapsed, 'fraction': elapsed/self.wall_time if self.wall_time else None}
+                for phase, elapsed in sorted(self.timers.items(), key=lambda item: -item[1])
+            },
+            'counts': dict(self.counts),
+            'kernel_cache': self.cache_stats,
+        }
+
+    def to_json(self, path: str = None) -> str:
+
+        """Returns the report as JSON, also writing it to path if given."""
+
+        report = json.dumps(self.report(), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(report)
+
+        return report
+
+    def save_capture(self, path: str):
+
+        """Write the cProfile stats (for pstats/snakeviz) or the pyinstrument HTML page."""
+
+        if self.capture == 'cprofile':
+            self._capture.dump_stats(path)
+        elif self.capture == 'pyinstrument':
+            with open(path, 'w') as f:
+                f.write(self._capture.output_html())
+        else:
+            raise ValueError('No capture was recorded, create the Profiler with capture set')
@@ -0,0 +1,111 @@
+import math
+import scipy
+import numpy as np
+
+
+def stretched_mesh(r_inner: float, r_outer: float, num_nodes: int) -> np.ndarray:
+
+    """Returns radial nodes whose spacing grows geometrically from the borehole wall to the far field."""
+
+    return r_inner*(r_outer/r_inner)**np.linspace(0, 1, num_nodes)
+
+
+class RadialFD:
+
+    """
+    Implicit finite-volume solver for radial conduction around a single borehole.
+
+    Solves (1/alpha) dT/dt = (1/r) d/dr(r dT/dr) on a stretched mesh with the ground load applied as a heat flux
+    at the borehole wall and undisturbed ground temperature at the far field. theta = 0.5 is Crank-Nicolson,
+    theta = 1 is backward Euler. Both are unconditionally stable, but Crank-Nicolson does not damp the fine-mesh
+    modes excited when the load is switched on, so near the wall they oscillate for the whole run. The first
+    damping_steps steps are therefore taken as two backward Euler half steps each (Rannacher's start).
+
+    Max wall temperature error against the line source over one year, for the Barton House array with a constant
+    load and (in brackets) with the analytic building load:
+
+        time step                     8 h            daily          weekly
+        Crank-Nicolson, no damping    0.62 (1.9)     0.86 (2.7)     1.4 (4.4)
+        Crank-Nicolson                0.02 (0.06)    0.06 (0.19)    0.09 (0.28)
+        backward Euler                0.09 (0.29)    0.15 (0.46)    0.19 (0.60)
+
+    Over the second half of the year both schemes are within 0.015 K up to daily steps. At weekly steps with a
+    varying load Crank-Nicolson drifts back to 0.1 K and backward Euler to 0.06 K, so use theta = 1 there.
+    """
+
+    def __init__(
+            self,
+            r_inner: float,
+            r_outer: float,
+            k: float,
+            alpha: float,
+            depth: float,
+            time_step: float,
+            T_ground: float,
+            num_nodes: int = 200,
+            theta: float = 0.5,
+            damping_steps: int = 2,
+        ) -> None:
+        self.radii = stretched_mesh(r_inner, r_outer, num_nodes)
+        self.depth = depth
+        self.theta = theta
+        self.damping_steps = damping_steps if theta < 1 else 0
+        self.num_steps = 0
+        self.T = np.full(num_nodes, float(T_ground))
+
+        # Control volumes per unit length bounded by the midpoints between nodes
+        faces = np.concatenate([[r_inner], 0.5*(self.radii[1:] + self.radii[:-1]), [r_outer]])
+        heat_capacity = (k/alpha)*math.pi*(faces[1:]**2 - faces[:-1]**2)/time_step
+        G = 2*math.pi*k*faces[1:-1]/np.diff(self.radii)  # Conductance between neighbouring nodes
+
+        # Tridiagonal conduction operator A, in the banded layout used by scipy.linalg.solve_banded
+        A = np.zeros((3, num_nodes))
+        A[0, 1:] = G
+        A[2, :-1] = G
+        A[1, :-1] -= G
+        A[1, 1:] -= G
+        self.A = A
+
+        self.heat_capacity = heat_capacity
+        self.lhs = self._lhs(theta, heat_capacity)
+        if self.damping_steps:
+            self.damped_lhs = self._lhs(1, 2*heat_capacity)
+
+    def _lhs(self, theta: float, heat_capacity: np.ndarray) -> np.ndarray:
+
+        """Returns the banded matrix of the implicit part of a step."""
+
+        lhs = -theta*self.A
+        lhs[1] += heat_capacity
+
+        # Far field is held at the undisturbed ground temperature
+        lhs[1, -1] = 1
+        lhs[2, -2] = 0
+
+        return lhs
+
+    def _solve(self, lhs: np.ndarray, heat_capacity: np.ndarray, theta: float, Q_g: float) -> np.ndarray:
+        T = self.T
+        rhs = heat_capacity*T
+        if theta < 1:
+            A_T = self.A[1]*T
+            A_T[:-1] += self.A[0, 1:]*T[1:]
+            A_T[1:] += self.A[2, :-1]*T[:-1]
+            rhs += (1-theta)*A_T
+        rhs[0] -= Q_g/self.depth
+        rhs[-1] = T[-1]
+
+        return scipy.linalg.solve_banded((1, 1), lhs, rhs)
+
+    def step(self, Q_g: float) -> np.ndarray:
+
+        """Advance one time step with ground load Q_g (W, positive when heat is extracted). Returns node temps."""
+
+        if self.num_steps < self.damping_steps:
+            for _ in range(2):
+                self.T = self._solve(self.damped_lhs, 2*self.heat_capacity, 1, Q_g)
+        else:
+            self.T = self._solve(self.lhs, self.heat_capacity, self.theta, Q_g)
+        self.num_steps += 1
+
+        return self.T
@@ -0,0 +1,151 @@
+import os
+import json
+import math
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+columns = ['Time (s)', 'Building load per BH (W)', 'Interface temp (K)', 'Borehole outlet/heat pump inlet temp (K)', 'COP', 'Ground load per BH (W)', 'Elec per BH (W)']
+
+
+class SimulationResults:
+
+    """
+    Per-step outputs of GSHP.model_single_bh held in preallocated arrays.
+
+    Can be indexed by the DataFrame column names. The DataFrame itself is only built by to_dataframe.
+    For batched runs each column has shape (n, size), one column per configuration.
+    """
+
+    __slots__ = ('time', 'building_load', 'interface_temp', 'outlet_temp', 'cop', 'ground_load', 'elec', 'n')
+
+    def __init__(self, n: int, size: int = None) -> None:
+        shape = (n,) if size is None else (n, size)
+        for name in SimulationResults.__slots__[:-1]:
+            setattr(self, name, np.zeros(shape))
+        self.n = 0
+
+    def append(self, t: float, Q_b: float, T_interface: float, T_w: float, cop: float, Q_g: float, Q_hp: float):
+
+        """Record one time step."""
+
+        i = self.n
+        self.time[i] = t
+        self.building_load[i] = Q_b
+        self.interface_temp[i] = T_interface
+        self.outlet_temp[i] = T_w
+        self.cop[i] = cop
+        self.ground_load[i] = Q_g
+        self.elec[i] = Q_hp
+        self.n += 1
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return getattr(self, SimulationResults.__slots__[columns.index(column)])[:self.n]
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+
+        """Build the DataFrame of all recorded steps."""
+
+        import pandas as pd
+
+        return pd.DataFrame({column: self[column] for column in columns})
+
+    def summary(self, num_boreholes: int, time_step: float, tariff=0.10) -> dict:
+
+        """Energy, demand and cost KPIs of the recorded steps, see kpis.summarise."""
+
+        from .kpis import summarise
+
+        return summarise(self, num_boreholes, time_step, tariff)
+
+
+class ResultsFile:
+
+    """
+    Per-step outputs of GSHP.model_single_bh written straight to a memory-mapped .npy file.
+
+    Only every `every`-th step is kept, so fine time steps over many years can be recorded without holding them
+    in memory. Indexing and to_dataframe work as for SimulationResults, returning views of the file. The file is a
+    structured array with one field per column and can be reopened with ResultsFile.open. every, time_step and
+    the number of steps run are saved alongside it in <path>.json on flush, so a reopened file can be integrated.
+    """
+
+    def __init__(self, path: str, n: int, size: int = None, every: int = 1, time_step: float = None) -> None:
+        self.path = path
+        self.every = every
+        self.time_step = time_step
+        field_shape = () if size is None else (size,)
+        dtype = np.dtype([(name, float, field_shape) for name in SimulationResults.__slots__[:-1]])
+        self.data = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(math.ceil(n/every),))
+        self.steps = 0
+        self.n = 0
+
+    @classmethod
+    def open(cls, path: str):
+
+        """Reopen a results file read-only, with every and time_step restored if its .json file is there."""
+
+        results = cls.__new__(cls)
+        results.path = path
+        results.data = np.load(path, mmap_mode='r')
+        results.n = len(results.data)
+        results.every, results.time_step, results.steps = None, None, results.n
+        if os.path.exists(f'{path}.json'):
+            with open(f'{path}.json') as f:
+                meta = json.load(f)
+            results.every, results.time_step, results.steps = meta['every'], meta['time_step'], meta['steps']
+            results.n = math.ceil(results.steps/results.every)
+        return results
+
+    def append(self, t: float, Q_b: float, T_interface: float, T_w: float, cop: float, Q_g: float, Q_hp: float):
+
+        """Record one time step, if it is one of those kept."""
+
+        if self.steps % self.every == 0:
+            self.data[self.n] = (t, Q_b, T_interface, T_w, cop, Q_g, Q_hp)
+            self.n += 1
+        self.steps += 1
+
+    def flush(self):
+        self.data.flush()
+        with open(f'{self.path}.json', 'w') as f:
+            json.dump({'every': self.every, 'time_step': self.time_step, 'steps': self.steps}, f)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.data[SimulationResults.__slots__[columns.index(column)]][:self.n]
+
+    to_dataframe = SimulationResults.to_dataframe
+
+    def summary(self, num_boreholes: int, time_step: float = None, tariff=0.10) -> dict:
+
+        """
+        Energy, demand and cost KPIs of the run, see kpis.summarise.
+
+        time_step = time step of the run (s), the one saved with the file by default. Each kept row stands for
+        the steps run over the rows kept, i.e. every steps, so energies and costs cover the whole run. Peaks and the
+        min COP are those of the kept rows only, and are labelled as sampled when every > 1.
+        """
+
+        from .kpis import summarise
+
+        time_step = time_step or self.time_step
+        if time_step is None:
+            raise ValueError(f'{self.path} has no saved time step, pass time_step')
+        every = self.every or 1
+        return summarise(self, num_boreholes, time_step*self.steps/self.n, tariff, sampled=every > 1)
+
+
+def iter_chunks(results, chunk_size: int = 8760):
+
+    """Yield the recorded steps of SimulationResults or a ResultsFile as dicts of column arrays, chunk_size steps at a time."""
+
+    for start in range(0, len(results), chunk_size):
+        yield {column: results[column][start:start+chunk_size] for column in columns}
@@ -0,0 +1,200 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .GSHP import GSHP
+from .loads import AnalyticLoad, ScaledProfile, seconds_in_year
+from .checkpoint import save_checkpoint, load_checkpoint
+
+
+# Interpolation table of borehole design outputs, precomputed over a grid of designs for fast queries.
+
+
+axes = ['depth', 'k_s', 'alpha_s', 'radius', 'load_scale']
+outputs = ['r_crit', 'num_boreholes', 'min_cop', 'min_outlet_temp']
+output_floors = np.array([0, 1, -np.inf, -np.inf])  # Physical lower limits, applied when extrapolating
+
+default_grid = {
+    'depth': [100, 150, 190, 250],
+    'k_s': [1.5, 2.3, 3.0],
+    'alpha_s': [1E-6, 1.5E-6, 2E-6],
+    'radius': [0.05, 0.06, 0.075],
+    'load_scale': [0.5, 1, 1.5],
+}
+
+# Barton House values of the parameters held fixed across the grid
+fixed_args = dict(
+    soil_density=2200,
+    grout_density=1400,
+    grout_heat_capacity=800,
+    grout_thermal_conductivity=1.4,
+)
+
+
+def critical_radius(ground_temps: np.ndarray, T_ground: float, epsilon: float, mesh_size: float = 0.1) -> float:
+
+    """Returns the radius beyond which the ground stays within epsilon (K) of T_ground, given temps every mesh_size m from the borehole."""
+
+    disturbed = np.nonzero(np.abs(ground_temps - T_ground) >= epsilon)[0]
+    if len(disturbed) and disturbed[-1] == len(ground_temps) - 1:
+        raise ValueError(f'Ground is still disturbed by {epsilon} K at {(len(ground_temps)-1)*mesh_size:.1f} m, use more radii')
+
+    return (disturbed[-1] + 1)*mesh_size if len(disturbed) else 0.0
+
+
+def evaluate_point(args: tuple) -> np.ndarray:
+
+    """
+    Run the physical model for one design. Returns its outputs, in the order of `outputs`.
+
+    args = (point, settings), point giving a value for each of `axes` and settings the Surrogate.build arguments.
+    optimise_borehole_config with Crank-Nicolson FD gives the number of boreholes and the radial ground temperature
+    after a year, from which r_crit is the radius beyond which the ground is within epsilon of T_ground. A year of
+    model_single_bh on that many boreholes then gives the minimum COP and heat pump inlet temperature.
+    """
+
+    point, settings = args
+    depth, k_s, alpha_s, radius, load_scale = point
+    bh_array = GSHP(
+        num_boreholes=1,
+        depth=depth,
+        radius=radius,
+        soil_heat_capacity=k_s/(fixed_args['soil_density']*alpha_s),
+        soil_thermal_conductivity=k_s,
+        **fixed_args
+    )
+    building_load = ScaledProfile(AnalyticLoad(), load_scale)
+    _, num_bhs = bh_array.optimise_borehole_config(
+        settings['max_heat_per_metre'], settings['T_ground'], settings['time_step'], True, 'cn',
+        num_radii=settings['num_radii'], verbose=False, building_load=building_load,
+    )
+    r_crit = critical_radius(bh_array.ground_temps, settings['T_ground'], settings['epsilon'])
+    bh_array.num_boreholes = num_bhs
+    system_props = bh_array.model_single_bh(
+        seconds_in_year, settings['time_step'], settings['T_ground'], True, as_frame=False, building_load=building_load,
+    )
+
+    return np.array([r_crit, num_bhs, system_props['COP'].min(), system_props['Borehole outlet/heat pump inlet temp (K)'].min()])
+
+
+class Surrogate:
+
+    """
+    Multilinear interpolation table of the design outputs over depth (m), k_s (W/mK), alpha_s (m2/s), radius (m)
+    and load_scale (factor on the analytic building load). Each axis needs at least two values.
+
+    Build the table once with Surrogate.build and save it; a loaded table answers each query without running the
+    model. Queries outside the sampled grid are extrapolated linearly and flagged, as they are only as good as the
+    trend at the edge of the grid, and r_crit and num_boreholes are kept to at least 0 and 1. num_boreholes is
+    interpolated too, so round it up before use.
+    """
+
+    def __init__(self, grid: dict, values: np.ndarray, settings: dict = None) -> None:
+        self.grid = {name: np.asarray(grid[name], dtype=float) for name in axes}
+        self.values = np.ascontiguousarray(values, dtype=float)
+        self.settings = settings or {}
+        self.lower = np.array([self.grid[name][0] for name in axes])
+        self.upper = np.array([self.grid[name][-1] for name in axes])
+
+        # Offsets of the 2**len(axes) corners of a grid cell into the flattened table, and which end of each axis they take
+        strides = np.array(self.values.strides[:len(axes)])//self.values.strides[len(axes)-1]
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(axes))))
+        self._offsets = self._corners @ strides
+        self._flat = self.values.reshape(-1, len(outputs))
+        # All axis values end to end, for looking up the ends of every point's cell in one go
+        self._knots = np.concatenate(list(self.grid.values()))
+        self._starts = np.cumsum([0] + [len(x) for x in self.grid.values()])[:-1]
+        self._last_cell = np.array([len(x) - 2 for x in self.grid.values()])
+
+    @classmethod
+    def build(cls, grid: dict = None, T_ground: float = 288, time_step: float = 8*3600, max_heat_per_metre: float = 50, epsilon: float = 0.1, num_radii: int = 400, max_workers: int = None, chunksize: int = 4):
+
+        """
+        Evaluate the model at every point of grid across processes and build the table.
+
+        grid = dict of increasing values for each of `axes`, default_grid by default
+        epsilon = ground temperature change (K) below which the ground counts as undisturbed, defining r_crit
+        num_radii = radii, 0.1 m apart, at which the ground temperature is found. Must reach undisturbed ground
+        max_workers, chunksize = as in sweep.run_sweep
+        """
+
+        grid = {**default_grid, **(grid or {})}
+        settings = dict(T_ground=T_ground, time_step=time_step, max_heat_per_metre=max_heat_per_metre, epsilon=epsilon, num_radii=num_radii)
+        points = list(itertools.product(*(grid[name] for name in axes)))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            values = list(executor.map(evaluate_point, [(point, settings) for point in points], chunksize=chunksize))
+
+        shape = tuple(len(grid[name]) for name in axes)
+        return cls(grid, np.reshape(values, shape + (len(outputs),)), settings)
+
+    def save(self, path: str):
+
+        """Write the table to an .npz file."""
+
+        save_checkpoint(path, {'grid': self.grid, 'values': self.values, 'settings': self.settings})
+
+    @classmethod
+    def load(cls, path: str):
+
+        """Read a table written by save."""
+
+        state = load_checkpoint(path)
+        settings = {name: value.item() for name, value in state.get('settings', {}).items()}
+        return cls(state['grid'], state['values'], settings)
+
+    def in_domain(self, points: np.ndarray) -> np.ndarray:
+
+        """Returns whether each point, an array of shape (..., len(axes)), lies within the sampled grid."""
+
+        return np.all((points >= self.lower) & (points <= self.upper), axis=-1)
+
+    def query(self, depth, k_s, alpha_s, radius, load_scale, warn: bool = True) -> dict:
+
+        """
+        Returns the interpolated outputs and an 'in_domain' flag for a design, or for arrays of designs at once.
+
+        warn = print a warning when any design lies outside the sampled grid
+        """
+
+        points = np.stack(np.broadcast_arrays(depth, k_s, alpha_s, radius, load_scale), axis=-1).astype(float)
+        inside = self.in_domain(points)
+        if warn and not inside.all():
+            print(f'WARNING: {np.size(inside) - np.count_nonzero(inside)} design(s) outside the sampled domain, extrapolating.')
+
+        result = self.interpolate(points.reshape(-1, len(axes))).reshape(points.shape[:-1] + (len(outputs),))
+        result = np.maximum(result, output_floors)
+        return {**{name: result[..., i][()] for i, name in enumerate(outputs)}, 'in_domain': inside[()]}
+
+    def interpolate(self, points: np.ndarray) -> np.ndarray:
+
+        """
+        Returns the outputs at points of shape (m, len(axes)), shape (m, len(outputs)).
+
+        Multilinear within each grid cell, as scipy's RegularGridInterpolator, and linear from the edge cell outside
+        the grid. Written out with NumPy as the scipy call overhead dominates single queries.
+        """
+
+        cells = np.column_stack([np.searchsorted(self.grid[name], points[:, j], side='right') for j, name in enumerate(axes)])
+        cells = np.minimum(np.maximum(cells - 1, 0), self._last_cell)
+        lower = self._knots[self._starts + cells]
+        fractions = (points - lower)/(self._knots[self._starts + cells + 1] - lower)
+
+        base = np.ravel_multi_index(cells.T, self.values.shape[:len(axes)])
+        weights = np.where(self._corners, fractions[:, None, :], 1 - fractions[:, None, :]).prod(axis=-1)
+        return np.einsum('mc,mco->mo', weights, self._flat[base[:, None] + self._offsets])
+
+
+def main(path: str, build: bool = False, max_workers: int = None, **point):
+
+    """Build and save a table to path, or query the one saved there."""
+
+    if build:
+        surrogate = Surrogate.build(max_workers=max_workers)
+        surrogate.save(path)
+        print(f'Saved {surrogate.values.size//len(outputs)} designs to {path}')
+    else:
+        surrogate = Surrogate.load(path)
+
+    if all(value is not None for value in point.values()):
+        for name, value in surrogate.query(**point).items():
+            print(f'{name}: {value}')
@@ -0,0 +1,111 @@
+import os
+import csv
+import itertools
+import numbers
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .GSHP import GSHP
+
+
+# Runs independent optimise_borehole_config simulations over a parameter grid in parallel.
+
+
+columns = ['case', 'L', 'n', 'k_s', 'alpha_s', 'capacity', 'fd', 'r_crit']
+
+
+def expand_grid(grid: dict | list[dict]) -> list[dict]:
+
+    """Returns every combination of a dict of parameter lists. A list of dicts is returned unchanged."""
+
+    if isinstance(grid, list):
+        return grid
+
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def plain(value):
+
+    """
+    Returns value as a built-in bool, float or str, so keys do not depend on the NumPy version's repr. Numbers
+    all become floats, so depth=100 and depth=100.0 are the same case.
+    """
+
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    return str(value)
+
+
+def case_key(gshp_args: dict, sim_args: dict) -> str:
+
+    """Returns a key identifying a sweep case, used to skip cases already in the CSV when resuming."""
+
+    return repr(sorted((name, plain(value)) for name, value in {**gshp_args, **sim_args}.items()))
+
+
+def run_case(case: tuple[dict, dict]) -> dict:
+
+    """Build a GSHP from gshp_args and run optimise_borehole_config with sim_args. Returns a table row."""
+
+    gshp_args, sim_args = case
+    bh_array = GSHP(**gshp_args)
+    r_crit, num_bhs = bh_array.optimise_borehole_config(**{'verbose': False, **sim_args})
+
+    return {
+        'case': case_key(gshp_args, sim_args),
+        'L': bh_array.L,
+        'n': num_bhs,
+        'k_s': bh_array.k_s,
+        'alpha_s': bh_array.alpha_s,
+        'capacity': num_bhs*sim_args['max_heat_per_metre']*bh_array.L,
+        'fd': sim_args['fd'],
+        'r_crit': r_crit,
+    }
+
+
+def run_sweep(gshp_grid: dict | list[dict], sim_grid: dict | list[dict], csv_path: str = None, max_workers: int = None, chunksize: int = 1) -> pd.DataFrame:
+
+    """
+    Run every combination of GSHP constructor args and optimise_borehole_config args across processes.
+
+    gshp_grid, sim_grid = dict of parameter lists to take the product of, or a list of parameter dicts
+    csv_path = rows are appended to this CSV as they finish. Cases already in it are skipped, so an interrupted sweep resumes.
+    Rows of other cases in the CSV are kept in the file but not returned
+    max_workers = number of processes, defaults to the number of CPUs
+    chunksize = cases sent to a worker at a time
+    """
+
+    cases = [(gshp_args, sim_args) for gshp_args in expand_grid(gshp_grid) for sim_args in expand_grid(sim_grid)]
+
+    rows = []
+    resuming = csv_path and os.path.exists(csv_path)
+    if resuming:
+        keys = {case_key(*case) for case in cases}
+        rows = [row for row in pd.read_csv(csv_path).to_dict('records') if row['case'] in keys]
+        done = {row['case'] for row in rows}
+        cases = [case for case in cases if case_key(*case) not in done]
+        print(f'Resuming sweep, {len(rows)} cases already in {csv_path}')
+
+    csv_file = None
+    if csv_path:
+        csv_file = open(csv_path, 'a', newline='')
+        writer = csv.DictWriter(csv_file, fieldnames=columns)
+        if not resuming:
+            writer.writeheader()
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for i, row in enumerate(executor.map(run_case, cases, chunksize=chunksize)):
+                rows.append(row)
+                if csv_file:
+                    writer.writerow(row)
+                    csv_file.flush()
+                print(f'[{i+1}/{len(cases)}] L={row["L"]} k_s={row["k_s"]:.3f} fd={row["fd"]} r_crit={row["r_crit"]}')
+    finally:
+        if csv_file:
+            csv_file.close()
+
+    return pd.DataFrame(rows, columns=columns).drop(columns='case')
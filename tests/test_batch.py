@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from Thermodynamics import GSHP, GSHPBatch, seconds_in_year
+from Thermodynamics.results import columns
+
+
+def borehole_array(depth: float, radius: float, k_s: float, k_g: float) -> GSHP:
+    return GSHP(
+        num_boreholes=11,
+        depth=depth,
+        radius=radius,
+        soil_density=2200,
+        soil_heat_capacity=710,
+        soil_thermal_conductivity=k_s,
+        grout_density=1400,
+        grout_heat_capacity=800,
+        grout_thermal_conductivity=k_g,
+    )
+
+
+# Configurations with the same radius and grout share a step response, so the batch has groups of one and of two
+configurations = [
+    (190, 0.06, 2.3, 1.4),
+    (150, 0.06, 1.5, 1.4),
+    (250, 0.05, 3.0, 1.4),
+    (190, 0.075, 2.3, 1.4),
+    (100, 0.05, 2.3, 1.4),
+    (190, 0.06, 2.3, 2.0),
+]
+
+
+@pytest.mark.parametrize('fast', [False, True])
+@pytest.mark.parametrize('coupled', [False, True])
+def test_batch_matches_scalar_runs(fast, coupled):
+    args = dict(t_n=seconds_in_year, time_step=8*3600, T_ground=288, is_heating=True, fast=fast, coupled=coupled)
+    batch = GSHPBatch([borehole_array(*configuration) for configuration in configurations])
+    assert len(batch.groups) == 4
+    results = batch.model_single_bh(**args)
+
+    for j, configuration in enumerate(configurations):
+        bh_array = borehole_array(*configuration)
+        expected = bh_array.model_single_bh(**args, as_frame=False)
+        for column in columns:
+            np.testing.assert_allclose(results[column][:, j], expected[column], rtol=1E-13, atol=1E-13, err_msg=column)
+        if coupled:
+            assert (batch.cop_iterations >= bh_array.cop_iterations).all()
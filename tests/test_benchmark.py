@@ -0,0 +1,21 @@
+import contextlib
+import io
+import numpy as np
+import pytest
+from Thermodynamics.benchmark import baseline_cases, decimate, golden_path, run_suite
+
+
+@pytest.mark.parametrize('pattern', ['dt=8h,years=1', 'radii=50', 'steps_per_hour=1'])
+def test_fast_cases_match_golden(pattern):
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = run_suite(pattern)
+    assert len(table)
+    assert table['Status'].isin(['ok', 'ok vs original']).all(), table[['Case', 'Status', 'Max abs error']].to_string()
+
+
+def test_reference_reproduces_baseline_golden():
+    name = 'model_single_bh[dt=8h,years=1,fast=False]'
+    golden = np.load(golden_path)
+    assert name in golden['baseline cases']
+    for output, values in baseline_cases()[name]().items():
+        np.testing.assert_array_equal(decimate(values), golden[f'{name}/{output}'])
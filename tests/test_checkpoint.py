@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from Thermodynamics import AnalyticLoad, seconds_in_year
+from Thermodynamics.benchmark import barton_house_array, cold_kernel_cache
+from Thermodynamics.checkpoint import load_checkpoint
+from Thermodynamics.results import columns
+from Thermodynamics.superposition import kernel_cache
+
+
+@pytest.mark.parametrize('fast', [False, True])
+@pytest.mark.parametrize('coupled', [False, True])
+def test_resume_matches_uninterrupted_run(tmp_path, fast, coupled):
+    args = dict(time_step=8*3600, T_ground=288, is_heating=True, fast=fast, coupled=coupled, as_frame=False)
+    full = barton_house_array().model_single_bh(2*seconds_in_year, **args)
+
+    checkpoint = str(tmp_path/'run.npz')
+    first = barton_house_array().model_single_bh(seconds_in_year, checkpoint=checkpoint, **args)
+    rest = barton_house_array().model_single_bh(2*seconds_in_year, resume=checkpoint, **args)
+
+    assert len(first) + len(rest) == len(full)
+    for column in columns:
+        np.testing.assert_array_equal(np.concatenate([first[column], rest[column]]), full[column])
+
+
+class CrashingLoad(AnalyticLoad):
+
+    """The analytic load, failing once asked for times past crash_at, to interrupt a run."""
+
+    def __init__(self, crash_at: float) -> None:
+        self.crash_at = crash_at
+
+    def block(self, t):
+        if np.max(t) > self.crash_at:
+            raise RuntimeError('interrupted')
+        return super().block(t)
+
+
+def test_resume_after_crash(tmp_path):
+    checkpoint = str(tmp_path/'run.npz')
+    args = dict(time_step=8*3600, T_ground=288, is_heating=True, as_frame=False, block_size=50)
+    full = barton_house_array().model_single_bh(seconds_in_year, **args)
+
+    with pytest.raises(RuntimeError):
+        barton_house_array().model_single_bh(seconds_in_year, checkpoint=checkpoint, checkpoint_every=100, building_load=CrashingLoad(520*8*3600), **args)
+    assert int(load_checkpoint(checkpoint)['step']) == 500
+
+    rest = barton_house_array().model_single_bh(seconds_in_year, resume=checkpoint, **args)
+    for column in columns:
+        np.testing.assert_array_equal(rest[column], full[column][500:])
+
+
+def test_resume_rejects_other_settings(tmp_path):
+    checkpoint = str(tmp_path/'run.npz')
+    barton_house_array().model_single_bh(seconds_in_year, 8*3600, 288, True, as_frame=False, checkpoint=checkpoint)
+    with pytest.raises(ValueError):
+        barton_house_array().model_single_bh(2*seconds_in_year, 4*3600, 288, True, as_frame=False, resume=checkpoint)
+
+
+def test_resume_rejects_earlier_end(tmp_path):
+    checkpoint = str(tmp_path/'run.npz')
+    barton_house_array().model_single_bh(seconds_in_year, 8*3600, 288, True, as_frame=False, checkpoint=checkpoint)
+    with pytest.raises(ValueError, match='past the last step'):
+        barton_house_array().model_single_bh(seconds_in_year/2, 8*3600, 288, True, as_frame=False, resume=checkpoint)
+
+
+def test_resume_computes_one_kernel(tmp_path):
+    checkpoint = str(tmp_path/'run.npz')
+    args = dict(time_step=8*3600, T_ground=288, is_heating=True, as_frame=False)
+    barton_house_array().model_single_bh(seconds_in_year, checkpoint=checkpoint, **args)
+    with cold_kernel_cache():
+        barton_house_array().model_single_bh(2*seconds_in_year, resume=checkpoint, **args)
+        assert kernel_cache.misses == 1
+        assert kernel_cache.evaluated == int(2*seconds_in_year//(8*3600)) + 1
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from BESS.dispatch import dispatch
+
+
+def naive_dispatch(consumption, generation, capacity, efficiency, soc_init=0):
+
+    """The original hour-by-hour charge/discharge loop, for one battery."""
+
+    soc = soc_init
+    soc_out, unmet, curtailed = [], [], []
+    for used, generated in zip(consumption, generation):
+        net = generated - used
+        if net > 0:
+            soc += net*efficiency
+        else:
+            soc += net
+        unmet.append(max(0, -soc))
+        curtailed.append(max(0, soc - capacity))
+        soc = min(capacity, max(0, soc))
+        soc_out.append(soc)
+
+    return np.array(soc_out), np.array(unmet), np.array(curtailed)
+
+
+def random_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 5, n), rng.uniform(0, 5, n)*rng.integers(0, 2, n)
+
+
+@pytest.mark.parametrize('n, chunk_size', [(1, 4096), (1000, 4096), (1000, 64), (1000, 999), (1025, 256)])
+@pytest.mark.parametrize('soc_init', [0, 7.5])
+def test_single_battery_matches_loop(n, chunk_size, soc_init):
+    consumption, generation = random_series(n)
+    result = dispatch(consumption, generation, 20, 0.85, soc_init=soc_init, chunk_size=chunk_size)
+    expected = naive_dispatch(consumption, generation, 20, 0.85, soc_init)
+
+    for actual, wanted in zip(result, expected):
+        np.testing.assert_allclose(actual, wanted, rtol=0, atol=1E-10)
+
+
+@pytest.mark.parametrize('num_batteries', [5, 40])  # Either side of min_batch, so both the scan and the stepping path
+@pytest.mark.parametrize('chunk_size', [4096, 100])
+def test_batch_matches_loop(num_batteries, chunk_size):
+    consumption, generation = random_series(500, seed=1)
+    rng = np.random.default_rng(2)
+    capacity = rng.uniform(1, 40, num_batteries)
+    efficiency = rng.uniform(0.7, 1, num_batteries)
+    soc_init = rng.uniform(0, 1, num_batteries)*capacity
+
+    soc, unmet, curtailed = dispatch(consumption, generation, capacity, efficiency, soc_init=soc_init, chunk_size=chunk_size, min_batch=32)
+
+    assert soc.shape == (num_batteries, 500)
+    for b in range(num_batteries):
+        expected = naive_dispatch(consumption, generation, capacity[b], efficiency[b], soc_init[b])
+        for actual, wanted in zip((soc[b], unmet[b], curtailed[b]), expected):
+            np.testing.assert_allclose(actual, wanted, rtol=0, atol=1E-10)
+
+
+def test_split_run_carries_soc():
+    consumption, generation = random_series(800, seed=3)
+    soc, unmet, curtailed = dispatch(consumption, generation, 15, 0.9)
+    first = dispatch(consumption[:300], generation[:300], 15, 0.9)
+    second = dispatch(consumption[300:], generation[300:], 15, 0.9, soc_init=first[0][-1])
+
+    for whole, *parts in zip((soc, unmet, curtailed), first, second):
+        np.testing.assert_allclose(whole, np.concatenate(parts), rtol=0, atol=1E-10)
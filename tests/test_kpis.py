@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from Thermodynamics import seconds_in_year
+from Thermodynamics.benchmark import barton_house_array
+from Thermodynamics.kpis import mean_price, summarise
+from Thermodynamics.results import ResultsFile
+
+hourly_tariff = 0.10 + 0.05*np.arange(24)/23
+
+
+def brute_force_price(t: float, time_step: float, tariff) -> float:
+
+    """Mean price over [t, t + time_step), sampled every second."""
+
+    seconds = t + np.arange(int(time_step)) + 0.5
+    return np.mean(np.asarray(tariff)[(seconds % (24*3600)//(24*3600/len(tariff))).astype(int)])
+
+
+def test_flat_tariff():
+    np.testing.assert_array_equal(mean_price([0, 3600, 7E6], 3600, 0.2), [0.2, 0.2, 0.2])
+
+
+@pytest.mark.parametrize('t, time_step', [
+    (0, 3600),  # One whole period
+    (1800, 3600),  # Straddling two periods
+    (23*3600, 2*3600),  # Across midnight
+    (5*24*3600 + 900, 8*3600),  # Several periods on a later day
+    (3600*7.25, 3*24*3600),  # Several days
+])
+def test_time_of_use_integrates_across_periods(t, time_step):
+    assert mean_price([t], time_step, hourly_tariff)[0] == pytest.approx(brute_force_price(t, time_step, hourly_tariff), rel=1E-12)
+
+
+def test_half_hourly_tariff():
+    tariff = np.repeat(hourly_tariff, 2)
+    t = np.arange(0, 3*24*3600, 2700)
+    np.testing.assert_allclose(mean_price(t, 2700, tariff), mean_price(t, 2700, hourly_tariff), rtol=1E-12)
+
+
+@pytest.fixture(scope='module')
+def run():
+    return barton_house_array().model_single_bh(seconds_in_year, 8*3600, 288, True, as_frame=False)
+
+
+def assert_summaries_close(actual: dict, expected: dict, rtol: float = 1E-12):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=rtol, err_msg=name)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 37, 500])
+def test_chunked_summary_matches_single_chunk(run, chunk_size):
+    expected = summarise(run, 11, 8*3600, hourly_tariff, chunk_size=len(run))
+    assert_summaries_close(summarise(run, 11, 8*3600, hourly_tariff, chunk_size=chunk_size), expected)
+    assert_summaries_close(summarise(run.to_dataframe(), 11, 8*3600, hourly_tariff, chunk_size=chunk_size), expected)
+
+
+def test_decimated_results_file_covers_the_whole_run(run, tmp_path):
+    path = str(tmp_path/'run.npy')
+    every = 4
+    decimated = barton_house_array().model_single_bh(seconds_in_year, 8*3600, 288, True, output=path, every=every)
+    full = summarise(run, 11, 8*3600, hourly_tariff)
+
+    summary = decimated.summary(11, tariff=hourly_tariff)
+    assert_summaries_close(ResultsFile.open(path).summary(11, tariff=hourly_tariff), summary)
+    assert 'Min COP, sampled' in summary and 'Min COP' not in summary
+
+    # Each kept row stands for every steps, so energies and costs estimate those of the whole run
+    for name in ['Heating demand (kWh)', 'HP elec demand (kWh)', 'Current elec cost (£)', 'Projected elec cost (£)']:
+        assert summary[name] == pytest.approx(full[name], rel=0.01)
+    np.testing.assert_allclose(summary['Monthly heating demand (kWh)'], full['Monthly heating demand (kWh)'], rtol=0.05)
+
+    rows = {column: np.asarray(run[column])[::every] for column in ['Time (s)', 'Building load per BH (W)', 'Elec per BH (W)', 'Ground load per BH (W)', 'COP']}
+    expected = summarise([rows], 11, 8*3600*len(run)/len(rows['COP']), hourly_tariff, sampled=True)
+    assert_summaries_close(summary, expected)
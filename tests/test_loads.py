@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Thermodynamics import AnalyticLoad, MeterLoad, SeriesLoad, seconds_in_year
+from Thermodynamics.benchmark import barton_house_array
+from Thermodynamics.results import columns
+
+
+@pytest.fixture
+def meter_csv(tmp_path):
+    """Two years of the analytic load sampled hourly, in kW, with a timestamp column that is not read."""
+    values = AnalyticLoad().block(3600*np.arange(2*8784))/1000
+    path = tmp_path/'meter.csv'
+    pd.DataFrame({'Timestamp': np.arange(len(values)), 'Load (kW)': values}).to_csv(path, index=False)
+    return str(path), 1000*pd.read_csv(path)['Load (kW)'].to_numpy()
+
+
+@pytest.mark.parametrize('block_size', [1, 5, 7, 100])
+def test_blocks_across_chunks_match_series(meter_csv, block_size):
+    path, values = meter_csv
+    meter = MeterLoad(path, 'Load (kW)', scale=1000, chunksize=7)
+    series = SeriesLoad(values)
+    t = 1800*np.arange(3*block_size*10)  # Half-hourly times, so samples repeat within and across blocks
+    for start in range(0, len(t), block_size):
+        np.testing.assert_array_equal(meter.block(t[start:start+block_size]), series.block(t[start:start+block_size]))
+
+
+def test_rewinds_for_earlier_times(meter_csv):
+    path, values = meter_csv
+    meter = MeterLoad(path, 'Load (kW)', scale=1000, chunksize=10)
+    late = meter.block(3600*np.arange(500, 520))
+    np.testing.assert_array_equal(meter.block(3600*np.arange(3, 8)), values[3:8])
+    np.testing.assert_array_equal(meter.block(3600*np.arange(500, 520)), late)
+    assert meter(3600*12.5) == values[12]
+
+
+def test_too_few_samples(meter_csv):
+    path, values = meter_csv
+    meter = MeterLoad(path, 'Load (kW)', scale=1000, chunksize=1000)
+    meter.block(3600*np.arange(len(values) - 10, len(values)))
+    with pytest.raises(ValueError, match='too few'):
+        meter.block(3600*np.arange(len(values) - 5, len(values) + 5))
+
+
+def test_model_results_match_series(meter_csv):
+    path, values = meter_csv
+    args = dict(t_n=seconds_in_year, time_step=8*3600, T_ground=288, is_heating=True, as_frame=False, block_size=100)
+    from_meter = barton_house_array().model_single_bh(**args, building_load=MeterLoad(path, 'Load (kW)', scale=1000, chunksize=1000))
+    from_series = barton_house_array().model_single_bh(**args, building_load=SeriesLoad(values))
+    for column in columns:
+        np.testing.assert_array_equal(from_meter[column], from_series[column])
@@ -0,0 +1,33 @@
+import math
+import numpy as np
+import pytest
+import scipy.special
+from Thermodynamics import seconds_in_year
+from Thermodynamics.benchmark import barton_house_array
+from Thermodynamics.radial_fd import RadialFD
+
+
+def wall_errors(time_step: float, theta: float, damping_steps: int = 2, Q_g: float = 2000) -> np.ndarray:
+
+    """Wall temperature error of RadialFD against the line source under a constant ground load, over one year."""
+
+    bh_array = barton_house_array()
+    n = int(seconds_in_year//time_step)
+    ground = RadialFD(bh_array.r, 1000, bh_array.k_s, bh_array.alpha_s, bh_array.L, time_step, 288, 200, theta, damping_steps)
+    T_wall = np.array([ground.step(Q_g)[0] for _ in range(n)])
+    t = time_step*np.arange(1, n+1)
+    exact = 288 + Q_g/(4*math.pi*bh_array.k_s*bh_array.L)*scipy.special.expi(-bh_array.r**2/(4*bh_array.alpha_s*t))
+
+    return np.abs(T_wall - exact)
+
+
+@pytest.mark.parametrize('time_step', [8*3600, 24*3600, 7*24*3600])
+@pytest.mark.parametrize('theta, max_error', [(0.5, 0.1), (1, 0.2)])
+def test_matches_line_source(time_step, theta, max_error):
+    errors = wall_errors(time_step, theta)
+    assert errors.max() < max_error
+    assert errors[len(errors)//2:].max() < 0.01
+
+
+def test_undamped_crank_nicolson_oscillates_at_coarse_steps():
+    assert wall_errors(7*24*3600, 0.5, damping_steps=0)[26:].max() > 0.3
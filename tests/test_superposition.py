@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pytest
+from Thermodynamics import Borefield, GSHPBatch, rectangular_grid, seconds_in_year
+from Thermodynamics.benchmark import barton_house_array, cold_kernel_cache
+from Thermodynamics.superposition import KernelCache, kernel_cache, line_source
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_model_computes_one_kernel_per_run(fast):
+    time_step = 8*3600
+    n = int(seconds_in_year//time_step)
+    with cold_kernel_cache():
+        barton_house_array().model_single_bh(seconds_in_year, time_step, 288, True, fast=fast, as_frame=False)
+        assert kernel_cache.misses == 1
+        assert kernel_cache.evaluated == n+1
+        assert [kernel.shape for kernel in kernel_cache.kernels.values()] == [(n+1,)]
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_batch_computes_one_kernel_per_group(fast):
+    time_step = 8*3600
+    n = int(seconds_in_year//time_step)
+    with cold_kernel_cache():
+        GSHPBatch([barton_house_array()]*3).model_single_bh(seconds_in_year, time_step, 288, True, fast=fast)
+        assert kernel_cache.misses == 1
+        assert kernel_cache.evaluated == n+1
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_borefield_computes_one_kernel_per_history(fast):
+    time_step = 8*3600
+    n = int(seconds_in_year//time_step)
+    field = Borefield(barton_house_array(), rectangular_grid(3, 2, 6))
+    with cold_kernel_cache():
+        field.model(seconds_in_year, time_step, 288, True, fast=fast)
+        assert kernel_cache.misses == 2
+        assert kernel_cache.evaluated == (1 + len(field.distances))*(n+1)
+
+
+def test_kernel_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.delenv('GSHP_KERNEL_CACHE', raising=False)
+    cache = KernelCache(maxsize=2)
+    for r in [0.05, 0.06, 0.05, 0.07]:
+        kernel = cache.get(r, 1E-6, 3600, 10)
+    assert not kernel.flags.writeable
+    assert (cache.hits, cache.misses, cache.evaluated) == (1, 3, 30)
+    assert cache.get(0.05, 1E-6, 3600, 10) is not None and cache.misses == 3
+    cache.get(0.06, 1E-6, 3600, 10)
+    assert cache.misses == 4
+
+
+def test_kernel_cache_extends_and_truncates(monkeypatch):
+    monkeypatch.delenv('GSHP_KERNEL_CACHE', raising=False)
+    cache = KernelCache()
+    long = cache.get(0.06, 1E-6, 3600, 20)
+    np.testing.assert_array_equal(cache.get(0.06, 1E-6, 3600, 5), long[:5])
+    np.testing.assert_array_equal(long, line_source(0.06, 1E-6, 3600*np.arange(1, 21)))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_kernel_cache_reuses_disk_kernels(tmp_path):
+    KernelCache(cache_dir=str(tmp_path)).get(0.06, 1E-6, 3600, 10)
+
+    cache = KernelCache(cache_dir=str(tmp_path))
+    kernel = cache.get(0.06, 1E-6, 3600, 5)
+    assert isinstance(kernel.base, np.memmap)
+    assert (cache.hits, cache.misses, cache.evaluated) == (1, 0, 0)
+
+    longer = cache.get(0.06, 1E-6, 3600, 20)
+    assert cache.evaluated == 20
+    np.testing.assert_array_equal(KernelCache(cache_dir=str(tmp_path)).get(0.06, 1E-6, 3600, 20), longer)
+
+
+def test_kernel_cache_keeps_mapped_file_it_cannot_replace(tmp_path, monkeypatch):
+    KernelCache(cache_dir=str(tmp_path)).get(0.06, 1E-6, 3600, 10)
+
+    def replace(src, dst):
+        raise PermissionError('file is mapped')
+
+    monkeypatch.setattr(os, 'replace', replace)
+    cache = KernelCache(cache_dir=str(tmp_path))
+    kernel = cache.get(0.06, 1E-6, 3600, 20)
+    np.testing.assert_array_equal(kernel, line_source(0.06, 1E-6, 3600*np.arange(1, 21)))
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.npy']
+    cache.get(0.06, 1E-6, 3600, 20)
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from scipy.interpolate import RegularGridInterpolator
+from Thermodynamics.surrogate import Surrogate, axes, critical_radius, default_grid, outputs
+
+
+@pytest.fixture
+def surrogate():
+    rng = np.random.default_rng(0)
+    shape = tuple(len(default_grid[name]) for name in axes)
+    return Surrogate(default_grid, rng.normal(size=shape + (len(outputs),)), {'T_ground': 288.0, 'epsilon': 0.1})
+
+
+def random_points(surrogate, m, margin):
+    rng = np.random.default_rng(1)
+    width = surrogate.upper - surrogate.lower
+    return surrogate.lower - margin*width + rng.random((m, len(axes)))*(1 + 2*margin)*width
+
+
+@pytest.mark.parametrize('margin', [0, 0.5])
+def test_interpolate_matches_regular_grid_interpolator(surrogate, margin):
+    points = random_points(surrogate, 500, margin)
+    reference = RegularGridInterpolator(tuple(surrogate.grid.values()), surrogate.values, bounds_error=False, fill_value=None)
+    np.testing.assert_allclose(surrogate.interpolate(points), reference(points), rtol=1E-12, atol=1E-12)
+    assert surrogate.in_domain(points).all() == (margin == 0)
+
+
+def test_grid_points_are_exact(surrogate):
+    index = (1, 2, 0, 1, 2)
+    point = [default_grid[name][i] for name, i in zip(axes, index)]
+    np.testing.assert_allclose(surrogate.interpolate(np.array([point]))[0], surrogate.values[index], rtol=1E-12)
+
+
+def test_save_load_round_trip(surrogate, tmp_path):
+    path = str(tmp_path/'designs.npz')
+    surrogate.save(path)
+    loaded = Surrogate.load(path)
+    assert loaded.settings == surrogate.settings
+    for name in axes:
+        np.testing.assert_array_equal(loaded.grid[name], surrogate.grid[name])
+    np.testing.assert_array_equal(loaded.values, surrogate.values)
+    points = random_points(surrogate, 50, 0.5)
+    np.testing.assert_array_equal(loaded.interpolate(points), surrogate.interpolate(points))
+
+
+def test_query_applies_output_floors(capsys):
+    shape = tuple(len(default_grid[name]) for name in axes)
+    values = np.zeros(shape + (len(outputs),))
+    values[...] = np.reshape(np.arange(shape[0]), (-1, 1, 1, 1, 1, 1))  # Every output rises by 1 per depth value
+    surrogate = Surrogate(default_grid, values)
+
+    result = surrogate.query(50, 2.3, 1.5E-6, 0.06, 1)
+    assert not result['in_domain']
+    assert 'outside the sampled domain' in capsys.readouterr().out
+    assert result['r_crit'] == 0 and result['num_boreholes'] == 1
+    assert result['min_cop'] < 0 and result['min_outlet_temp'] < 0
+
+    result = surrogate.query([150, 190], 2.3, 1.5E-6, 0.06, 1, warn=False)
+    np.testing.assert_allclose(result['r_crit'], [1, 2])
+    assert result['in_domain'].all()
+    assert capsys.readouterr().out == ''
+
+
+def test_critical_radius():
+    ground_temps = 288 - np.array([3, 1, 0.5, 0.2, 0.05, 0.01])
+    assert critical_radius(ground_temps, 288, 0.1) == pytest.approx(0.4)
@@ -0,0 +1,22 @@
+import numpy as np
+from Thermodynamics import GSHP
+from Thermodynamics.benchmark import barton_house_array
+from Thermodynamics.sweep import case_key
+
+
+def test_case_key_ignores_numeric_type():
+    assert case_key({'depth': 100}, {'fd': True}) == case_key({'depth': 100.0}, {'fd': np.bool_(True)})
+    assert case_key({'depth': np.int64(100)}, {}) == case_key({'depth': np.float64(100)}, {})
+    assert case_key({'depth': 100}, {'fd': True}) != case_key({'depth': 100}, {'fd': 'cn'})
+
+
+def test_explicit_zero_resistances_are_kept():
+    bh_array = barton_house_array()
+    args = dict(
+        num_boreholes=bh_array.num_boreholes, depth=bh_array.L, radius=bh_array.r, soil_density=2200, soil_heat_capacity=710,
+        soil_thermal_conductivity=bh_array.k_s, grout_density=1400, grout_heat_capacity=800, grout_thermal_conductivity=bh_array.k_g,
+    )
+    zero = GSHP(**args, pipe_conduction_resistance=0, grout_conduction_resistance=0, pipe_convection_resistance=0)
+    assert (zero.R_p, zero.R_g, zero.R_con) == (0, 0, 0)
+    default = GSHP(**args)
+    assert (default.R_p, default.R_g, default.R_con) == (bh_array.R_p, bh_array.R_g, bh_array.R_con)